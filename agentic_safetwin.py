@@ -20,18 +20,28 @@ Conformité: ISO 45001, CNESST, EU AI Act
 """
 
 import os
+import operator
 import json
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Literal, TypedDict
+from collections import OrderedDict
+from typing import Annotated, cast, Dict, List, Any, Optional, Literal, Tuple, TypedDict
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+from secrets import token_hex
+from types import MappingProxyType
 import hashlib
+import uuid
+
+import numpy as np
+import orjson
 
 # LangGraph & LangChain
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolExecutor
+from langgraph.types import CachePolicy
+from langgraph.cache.memory import InMemoryCache
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool
@@ -39,6 +49,12 @@ from langchain_core.tools import tool
 # Async HTTP
 import httpx
 
+# Cache Redis des réponses LLM (optionnel: sans client redis, pas de cache)
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None  # type: ignore[assignment]
+
 # Logging structuré
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +62,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SafeTwinAgentique")
 
+# Horloge locale (méthode liée une fois: évite la résolution d'attribut à chaque horodatage)
+_now = datetime.now
+
 
 # =============================================================================
 # CONFIGURATION
@@ -57,6 +76,12 @@ class AgenticConfig:
     # LLM
     llm_model: str = "claude-sonnet-4-20250514"
     anthropic_api_key: str = field(default_factory=lambda: os.getenv("ANTHROPIC_API_KEY", ""))
+    # Recommandation LLM du Perceptron (désactivée par défaut: analyse à règles seule)
+    llm_enabled: bool = os.getenv("SAFETWIN_LLM", "0") == "1"
+    
+    # Cache LLM
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    llm_cache_ttl_seconds: int = 3600
     
     # API SafeTwin
     safetwin_api_url: str = os.getenv("SAFETWIN_API_URL", "http://localhost:8000")
@@ -73,14 +98,31 @@ class AgenticConfig:
     # Performance
     latency_target_ms: int = 2000
     success_rate_target: float = 0.85
+    planner_cache_ttl_seconds: int = 300  # Durée de vie d'un plan en cache
+    planner_cache_size: int = 1024  # Plans conservés (les plus récents)
     
     # Gouvernance
     audit_enabled: bool = True
+    audit_log_path: str = os.getenv("SAFETWIN_AUDIT_LOG", "/tmp/safetwin_audit.jsonl")
+    audit_queue_size: int = 10_000
+    max_sessions: int = 10_000  # Sessions conservées en mémoire (les plus récentes)
     kill_switch_enabled: bool = True
 
 
 config = AgenticConfig()
 
+# Client HTTP partagé (pool de connexions keep-alive vers l'API SafeTwin)
+http_client = httpx.AsyncClient(
+    base_url=config.safetwin_api_url,
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+
+async def aclose_http_client():
+    """Ferme le client HTTP partagé (arrêt de l'application)"""
+    await http_client.aclose()
+
 
 # =============================================================================
 # TYPES ET ÉTATS
@@ -101,13 +143,30 @@ class ActionType(Enum):
     UPDATE_KG = "update_kg"
 
 
+@dataclass(slots=True)
+class Anomaly:
+    """Anomalie capteur détectée par le Perceptron"""
+    sensor: str
+    value: float
+    threshold: float
+    severity: str
+    location: str
+
+
 class AgentState(TypedDict):
-    """État partagé entre les agents"""
+    """
+    État partagé entre les agents.
+    
+    Chaque agent ne retourne que les clés qu'il produit. Les journaux
+    cumulatifs (actions en attente, feedback) ont un réducteur d'ajout:
+    l'agent retourne seulement ses nouvelles entrées.
+    """
     # Données d'entrée
     sensor_data: Dict[str, Any]
     risk_score: int
     risk_level: str
-    anomalies: List[Dict]
+    anomalies: List[Anomaly]
+    recommendation: Optional[str]
     
     # Planification
     tasks: List[Dict]
@@ -116,27 +175,148 @@ class AgentState(TypedDict):
     
     # Exécution
     actions_taken: List[Dict]
-    actions_pending: List[Dict]
+    actions_pending: Annotated[List[Dict], operator.add]
     
     # Apprentissage
-    feedback: List[Dict]
+    feedback: Annotated[List[Dict], operator.add]
     kg_updates: List[Dict]
+    analysis_event: Optional[Dict]
     
     # Contrôle
     requires_escalation: bool
     human_decision: Optional[str]
     iteration: int
     
-    # Audit
-    audit_log: List[Dict]
+    # Audit (le journal est diffusé hors état, voir _audit_write)
     session_id: str
     timestamp: str
 
 
+# =============================================================================
+# AUDIT
+# =============================================================================
+# Les événements d'audit ne transitent pas par l'état LangGraph: ils sont
+# sérialisés par l'agent (orjson) puis publiés dans une file bornée de lignes
+# JSONL, écrites dans le fichier par une tâche de fond. File pleine: l'agent
+# attend (contre-pression), aucun événement n'est perdu: un lot dont
+# l'écriture échoue est conservé et réécrit par la tâche suivante.
+
+_audit_queue: Optional[asyncio.Queue] = None
+_audit_writer_task: Optional[asyncio.Task] = None
+# Lot en cours d'écriture (retiré de la file, pas encore acquitté)
+_audit_batch: List[bytes] = []
+
+
+def _write_lines(fh, lines: List[bytes]) -> None:
+    """Écrit un lot de lignes JSONL et le pousse sur disque"""
+    fh.writelines(lines)
+    fh.flush()
+
+
+async def _audit_writer(queue: asyncio.Queue):
+    """Tâche de fond: écrit les événements d'audit en JSONL, par lots, hors de la boucle"""
+    fh = await asyncio.to_thread(open, config.audit_log_path, "ab")
+    try:
+        while True:
+            # Lot laissé par une tâche précédente en échec: réécrit en premier
+            if not _audit_batch:
+                _audit_batch.append(await queue.get())
+                while not queue.empty():
+                    _audit_batch.append(queue.get_nowait())
+            await asyncio.to_thread(_write_lines, fh, _audit_batch)
+            # Acquitté seulement une fois écrit (flush_audit attend ces lignes)
+            for _ in _audit_batch:
+                queue.task_done()
+            _audit_batch.clear()
+    finally:
+        await asyncio.to_thread(fh.close)
+
+
+def _check_audit_writer(task: asyncio.Task) -> None:
+    """Remonte l'erreur d'une tâche d'écriture terminée (journalisée puis relevée)"""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        pending = len(_audit_batch) + (_audit_queue.qsize() if _audit_queue is not None else 0)
+        logger.error(f"Audit: échec de l'écriture du journal ({pending} événements en attente): {error!r}")
+        raise error
+
+
+def _audit_queue_with_writer() -> asyncio.Queue:
+    """File d'audit unique, avec une tâche d'écriture active"""
+    global _audit_queue, _audit_writer_task
+    
+    queue = _audit_queue
+    if queue is None:
+        queue = _audit_queue = asyncio.Queue(maxsize=config.audit_queue_size)
+    
+    task = _audit_writer_task
+    if task is None or task.done():
+        if task is not None:
+            # Tâche morte: l'erreur est remontée avant tout redémarrage; les
+            # événements restent dans la file (et dans le lot en attente)
+            try:
+                _check_audit_writer(task)
+            except Exception:
+                logger.warning("Audit: redémarrage de l'écriture du journal")
+        _audit_writer_task = asyncio.create_task(_audit_writer(queue))
+    return queue
+
+
+async def _audit_write(session_id: str, agent: str, action: str, ts: str, **kv) -> None:
+    """Sérialise et publie un événement d'audit (attend si la file est pleine)"""
+    if not config.audit_enabled:
+        return
+    
+    queue = _audit_queue_with_writer()
+    line = orjson.dumps(
+        {"session_id": session_id, "agent": agent, "action": action, "timestamp": ts, **kv},
+        option=orjson.OPT_APPEND_NEWLINE
+    )
+    await queue.put(line)
+
+
+async def flush_audit():
+    """
+    Attend l'écriture de tous les événements d'audit en file.
+    
+    Si la tâche d'écriture s'arrête sur une erreur, celle-ci est journalisée
+    et relevée: l'appelant sait que le journal n'est pas complet (la tâche
+    est redémarrée au prochain événement, sans perte).
+    """
+    global _audit_writer_task
+    
+    queue, task = _audit_queue, _audit_writer_task
+    if queue is None or task is None:
+        return
+    if not task.done():
+        joined = asyncio.ensure_future(queue.join())
+        await asyncio.wait((joined, task), return_when=asyncio.FIRST_COMPLETED)
+        if not joined.done():
+            joined.cancel()
+    if task.done():
+        _audit_writer_task = None
+        _check_audit_writer(task)
+
+
 # =============================================================================
 # OUTILS (TOOLS)
 # =============================================================================
 
+# Schéma des capteurs simulés:
+# (nom, min, max, seuil warning, seuil critique, unité, localisation)
+_SENSOR_SCHEMA = (
+    ("temperature", 18, 45, 35, 42, "°C", "Zone A - Unité Craquage"),
+    ("vibration", 0, 15, 8, 12, "mm/s", "Compresseur P-101"),
+    ("gas_h2s", 0, 25, 10, 20, "ppm", "Zone B - Stockage"),
+    ("noise", 60, 95, 85, 90, "dB", "Atelier Maintenance"),
+)
+_SENSOR_LOWS = np.array([row[1] for row in _SENSOR_SCHEMA], dtype=float)
+_SENSOR_HIGHS = np.array([row[2] for row in _SENSOR_SCHEMA], dtype=float)
+_RNG = np.random.default_rng()
+
+
 @tool
 def fetch_sensor_data(sensor_type: str = "all") -> Dict[str, Any]:
     """
@@ -149,37 +329,17 @@ def fetch_sensor_data(sensor_type: str = "all") -> Dict[str, Any]:
         Données des capteurs avec timestamps
     """
     # Simulation - En prod: connexion MQTT broker
-    import random
-    
+    # Tirage de toutes les valeurs en un seul appel vectorisé
+    values = _RNG.uniform(_SENSOR_LOWS, _SENSOR_HIGHS).tolist()
     sensors = {
-        "temperature": {
-            "value": random.uniform(18, 45),
-            "unit": "°C",
-            "threshold_warning": 35,
-            "threshold_critical": 42,
-            "location": "Zone A - Unité Craquage"
-        },
-        "vibration": {
-            "value": random.uniform(0, 15),
-            "unit": "mm/s",
-            "threshold_warning": 8,
-            "threshold_critical": 12,
-            "location": "Compresseur P-101"
-        },
-        "gas_h2s": {
-            "value": random.uniform(0, 25),
-            "unit": "ppm",
-            "threshold_warning": 10,
-            "threshold_critical": 20,
-            "location": "Zone B - Stockage"
-        },
-        "noise": {
-            "value": random.uniform(60, 95),
-            "unit": "dB",
-            "threshold_warning": 85,
-            "threshold_critical": 90,
-            "location": "Atelier Maintenance"
+        name: {
+            "value": value,
+            "unit": unit,
+            "threshold_warning": warning,
+            "threshold_critical": critical,
+            "location": location
         }
+        for value, (name, _, _, warning, critical, unit, location) in zip(values, _SENSOR_SCHEMA)
     }
     
     if sensor_type != "all":
@@ -189,7 +349,7 @@ def fetch_sensor_data(sensor_type: str = "all") -> Dict[str, Any]:
 
 
 @tool
-def fetch_hse_stats(jurisdiction: str = "all") -> Dict[str, Any]:
+async def fetch_hse_stats(jurisdiction: str = "all") -> Dict[str, Any]:
     """
     Récupère les statistiques HSE depuis l'API SafeTwin.
     
@@ -200,8 +360,7 @@ def fetch_hse_stats(jurisdiction: str = "all") -> Dict[str, Any]:
         Statistiques HSE (2.85M incidents)
     """
     try:
-        import httpx
-        response = httpx.get(f"{config.safetwin_api_url}/stats", timeout=10)
+        response = await http_client.get("/stats")
         if response.status_code == 200:
             return response.json()
     except Exception as e:
@@ -214,8 +373,26 @@ def fetch_hse_stats(jurisdiction: str = "all") -> Dict[str, Any]:
     }
 
 
+# Risque de base (fallback) par secteur: dérivé d'un hash stable du nom,
+# calculé une fois à l'import (hash() de Python varie d'un processus à l'autre)
+_SECTOR_BASE_RISK = MappingProxyType({
+    sector: int.from_bytes(hashlib.blake2b(sector.encode(), digest_size=2).digest(), "big") % 40 + 40
+    for sector in (
+        "CONSTRUCTION",
+        "SOINS DE SANTE",
+        "FABRICATION",
+        "TRANSPORT ET ENTREPOSAGE",
+        "COMMERCE",
+        "AGRICULTURE",
+        "MINES ET CARRIERES",
+        "ADMINISTRATION PUBLIQUE",
+        "ENSEIGNEMENT",
+    )
+})
+
+
 @tool
-def predict_risk(sector: str, employees: int = 100) -> Dict[str, Any]:
+async def predict_risk(sector: str, employees: int = 100) -> Dict[str, Any]:
     """
     Prédit le risque pour un secteur donné via ML.
     
@@ -227,11 +404,9 @@ def predict_risk(sector: str, employees: int = 100) -> Dict[str, Any]:
         Score de risque et recommandations
     """
     try:
-        import httpx
-        response = httpx.post(
-            f"{config.safetwin_api_url}/predictions",
-            json={"sector": sector, "employees": employees},
-            timeout=10
+        response = await http_client.post(
+            "/predictions",
+            json={"sector": sector, "employees": employees}
         )
         if response.status_code == 200:
             return response.json()
@@ -239,7 +414,7 @@ def predict_risk(sector: str, employees: int = 100) -> Dict[str, Any]:
         logger.error(f"Erreur prediction: {e}")
     
     # Fallback avec calcul simple
-    base_risk = hash(sector) % 40 + 40
+    base_risk = _SECTOR_BASE_RISK.get(sector.upper(), 50)
     return {
         "sector": sector,
         "risk_score": base_risk,
@@ -250,7 +425,7 @@ def predict_risk(sector: str, employees: int = 100) -> Dict[str, Any]:
 
 
 @tool
-def send_alert(
+async def send_alert(
     channel: str,
     severity: str,
     message: str,
@@ -268,7 +443,7 @@ def send_alert(
     Returns:
         Confirmation d'envoi
     """
-    alert_id = hashlib.md5(f"{datetime.now()}{message}".encode()).hexdigest()[:8]
+    alert_id = token_hex(4)
     
     logger.warning(f"🚨 ALERTE [{severity.upper()}] via {channel}: {message}")
     
@@ -278,42 +453,45 @@ def send_alert(
         "channel": channel,
         "severity": severity,
         "message": message,
-        "sent_at": datetime.now().isoformat(),
+        "sent_at": _now().isoformat(),
         "status": "sent"
     }
 
 
+# Écriture KG par lot: une seule requête (une transaction) pour N entités
+KG_MERGE_CYPHER = """
+UNWIND $rows AS r
+MERGE (e:Entity {id: r.entity_id})
+SET e += r.properties, e.type = r.entity_type, e.updated_at = $updated_at
+"""
+
+
 @tool
-def update_knowledge_graph(
-    entity_type: str,
-    entity_id: str,
-    properties: Dict[str, Any]
-) -> Dict[str, Any]:
+async def update_knowledge_graph(entities: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Met à jour le Knowledge Graph Neo4j.
+    Met à jour le Knowledge Graph Neo4j (lot d'entités).
     
     Args:
-        entity_type: Risk, Incident, Zone, Equipment
-        entity_id: Identifiant de l'entité
-        properties: Propriétés à mettre à jour
+        entities: Liste de {entity_type, entity_id, properties}
+            (entity_type: Risk, Incident, Zone, Equipment, ...)
     
     Returns:
         Confirmation de mise à jour
     """
-    logger.info(f"📊 KG Update: {entity_type}/{entity_id} -> {properties}")
+    logger.info(f"📊 KG Update: {len(entities)} entités")
+    updated_at = _now().isoformat()
     
-    # En prod: requête Cypher vers Neo4j
+    # En prod: session.run(KG_MERGE_CYPHER, rows=entities, updated_at=updated_at)
     return {
-        "entity_type": entity_type,
-        "entity_id": entity_id,
-        "updated_properties": properties,
-        "updated_at": datetime.now().isoformat(),
+        "entity_ids": [entity.get("entity_id") for entity in entities],
+        "count": len(entities),
+        "updated_at": updated_at,
         "status": "success"
     }
 
 
 @tool
-def generate_report(
+async def generate_report(
     report_type: str,
     period: str = "daily",
     format: str = "pdf"
@@ -329,7 +507,7 @@ def generate_report(
     Returns:
         Lien vers le rapport généré
     """
-    report_id = f"RPT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    report_id = f"RPT-{_now().strftime('%Y%m%d%H%M%S')}"
     
     logger.info(f"📄 Rapport généré: {report_type} ({period}) -> {report_id}")
     
@@ -339,12 +517,12 @@ def generate_report(
         "period": period,
         "format": format,
         "url": f"/reports/{report_id}.{format}",
-        "generated_at": datetime.now().isoformat()
+        "generated_at": _now().isoformat()
     }
 
 
 @tool
-def control_plc(
+async def control_plc(
     equipment_id: str,
     command: str,
     parameters: Dict[str, Any] = None
@@ -368,7 +546,7 @@ def control_plc(
         "equipment_id": equipment_id,
         "command": command,
         "parameters": parameters,
-        "executed_at": datetime.now().isoformat(),
+        "executed_at": _now().isoformat(),
         "status": "executed" if command != "emergency_stop" else "pending_confirmation"
     }
 
@@ -384,22 +562,123 @@ TOOLS = [
     control_plc
 ]
 
+# Outils exécutables par l'Exécuteur, indexés par nom
+TOOL_MAP = {t.name: t for t in (send_alert, generate_report, update_knowledge_graph, control_plc)}
+
 
 # =============================================================================
 # AGENTS SPÉCIALISÉS
 # =============================================================================
 
+@lru_cache(maxsize=1)
+def get_shared_llm() -> ChatAnthropic:
+    """
+    Client LLM partagé par tous les agents (un seul pool HTTP Anthropic).
+    """
+    return ChatAnthropic(
+        model=config.llm_model,
+        api_key=config.anthropic_api_key,
+        temperature=0.1
+    )
+
+
+class LLMCache:
+    """
+    Cache des réponses LLM dans Redis.
+    
+    Clé sha256 exacte sur (modèle, prompt système, message utilisateur).
+    Une erreur Redis est traitée comme un miss: le cache ne bloque jamais un agent.
+    """
+    
+    def __init__(self, redis_url: str, ttl_seconds: int = 3600):
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger("LLMCache")
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_message: str) -> str:
+        """Construit la clé de cache d'un appel LLM"""
+        digest = hashlib.sha256(
+            orjson.dumps([model, system_prompt, user_message])
+        ).hexdigest()
+        return f"llm:{digest}"
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Retourne la réponse en cache, ou None"""
+        try:
+            # decode_responses=True: valeurs en str
+            return cast(Optional[str], await self.redis.get(key))
+        except Exception as e:
+            self.logger.warning(f"Cache LLM indisponible (get): {e}")
+            return None
+    
+    async def set(self, key: str, response: str) -> None:
+        """Stocke une réponse avec expiration"""
+        try:
+            await self.redis.set(key, response, ex=self.ttl_seconds)
+        except Exception as e:
+            self.logger.warning(f"Cache LLM indisponible (set): {e}")
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> Optional[LLMCache]:
+    """Cache LLM partagé, créé au premier appel LLM (None sans client redis)"""
+    if aioredis is None:
+        return None
+    return LLMCache(config.redis_url, config.llm_cache_ttl_seconds)
+
+
+def system_message(system_prompt: str) -> SystemMessage:
+    """
+    Prompt système marqué pour le prompt caching Anthropic.
+    Les prompts d'agents sont statiques: le préfixe est réutilisé côté serveur.
+    """
+    return SystemMessage(content=[{
+        "type": "text",
+        "text": system_prompt,
+        "cache_control": {"type": "ephemeral"}
+    }])
+
+
+async def ask_llm(system_prompt: str, user_message: str) -> str:
+    """
+    Interroge le LLM partagé, avec cache des réponses.
+    
+    Args:
+        system_prompt: Prompt système de l'agent (ex: PERCEPTRON_PROMPT)
+        user_message: Contenu utilisateur (état capteurs, anomalies...)
+    
+    Returns:
+        Contenu texte de la réponse
+    """
+    cache = get_llm_cache()
+    key = LLMCache.make_key(config.llm_model, system_prompt, user_message)
+    
+    if cache is not None:
+        cached = await cache.get(key)
+        if cached is not None:
+            logger.info("💾 Cache LLM hit")
+            return cached
+    
+    response = await get_shared_llm().ainvoke([
+        system_message(system_prompt),
+        HumanMessage(content=user_message)
+    ])
+    content = response.content if isinstance(response.content, str) else orjson.dumps(response.content).decode()
+    
+    if cache is not None:
+        await cache.set(key, content)
+    
+    return content
+
+
 class BaseAgent:
     """Classe de base pour tous les agents"""
     
     def __init__(self, name: str, role: str):
         self.name = name
         self.role = role
-        self.llm = ChatAnthropic(
-            model=config.llm_model,
-            api_key=config.anthropic_api_key,
-            temperature=0.1
-        )
+        self.llm = get_shared_llm()
         self.logger = logging.getLogger(f"Agent.{name}")
     
     def log_action(self, action: str, details: Dict = None):
@@ -409,7 +688,7 @@ class BaseAgent:
             "agent": self.name,
             "action": action,
             "details": details,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now().isoformat()
         }
 
 
@@ -445,48 +724,69 @@ Retourne TOUJOURS un JSON avec:
 }
 """
 
-async def agent_perceptron(state: AgentState) -> AgentState:
+async def perceptron_recommendation(risk_level: str, anomalies: List[Anomaly]) -> Optional[str]:
+    """
+    Recommandation du LLM pour les anomalies détectées (None si l'appel échoue).
+    
+    Le message ne porte que la signature des anomalies (capteur, sévérité,
+    lieu), sans les valeurs mesurées: une situation récurrente donne la même
+    requête et est servie par le cache LLM.
+    """
+    user_message = orjson.dumps({
+        "risk_level": risk_level,
+        "anomalies": [
+            {"sensor": a.sensor, "severity": a.severity, "location": a.location}
+            for a in anomalies
+        ]
+    }).decode()
+    try:
+        content = await ask_llm(PERCEPTRON_PROMPT, user_message)
+    except Exception as e:
+        logger.warning(f"👁️ Perceptron: recommandation LLM indisponible: {e}")
+        return None
+    # Le prompt demande un JSON; à défaut, le texte brut fait office de recommandation
+    try:
+        return orjson.loads(content).get("recommendation") or content
+    except (orjson.JSONDecodeError, AttributeError):
+        return content
+
+
+async def agent_perceptron(state: AgentState) -> Dict[str, Any]:
     """Agent Perceptron - Analyse et détection"""
     logger.info("👁️ Agent Perceptron: Analyse en cours...")
+    ts = _now().isoformat()
     
     # Récupérer données capteurs
     sensor_data = fetch_sensor_data.invoke({"sensor_type": "all"})
     
-    # Calculer score de risque
-    anomalies = []
-    risk_scores = []
+    # Calculer score de risque (vectorisé sur l'ensemble des capteurs)
+    readings = [(name, data) for name, data in sensor_data.items() if data]
+    values = np.asarray([data.get("value", 0) for _, data in readings], dtype=float)
+    warning = np.asarray([data.get("threshold_warning", 100) for _, data in readings], dtype=float)
+    critical = np.asarray([data.get("threshold_critical", 100) for _, data in readings], dtype=float)
     
-    for sensor_name, data in sensor_data.items():
-        if not data:
-            continue
-            
-        value = data.get("value", 0)
-        warning = data.get("threshold_warning", 100)
-        critical = data.get("threshold_critical", 100)
-        
-        if value >= critical:
-            anomalies.append({
-                "sensor": sensor_name,
-                "value": value,
-                "threshold": critical,
-                "severity": "critical",
-                "location": data.get("location", "Unknown")
-            })
-            risk_scores.append(95)
-        elif value >= warning:
-            anomalies.append({
-                "sensor": sensor_name,
-                "value": value,
-                "threshold": warning,
-                "severity": "warning",
-                "location": data.get("location", "Unknown")
-            })
-            risk_scores.append(75)
+    is_critical = values >= critical
+    is_warning = ~is_critical & (values >= warning)
+    risk_scores = np.where(is_critical, 95, np.where(is_warning, 75, 30))
+    
+    # Anomalies: uniquement les capteurs hors seuil
+    anomalies = []
+    for i in np.flatnonzero(is_critical | is_warning).tolist():
+        sensor_name, data = readings[i]
+        if is_critical[i]:
+            threshold, severity = data.get("threshold_critical", 100), "critical"
         else:
-            risk_scores.append(30)
+            threshold, severity = data.get("threshold_warning", 100), "warning"
+        anomalies.append(Anomaly(
+            sensor=sensor_name,
+            value=data.get("value", 0),
+            threshold=threshold,
+            severity=severity,
+            location=data.get("location", "Unknown")
+        ))
     
     # Score composite
-    risk_score = int(sum(risk_scores) / len(risk_scores)) if risk_scores else 0
+    risk_score = int(np.mean(risk_scores)) if risk_scores.size else 0
     
     # Niveau de risque
     if risk_score >= 85:
@@ -498,25 +798,37 @@ async def agent_perceptron(state: AgentState) -> AgentState:
     else:
         risk_level = "low"
     
-    # Mettre à jour l'état
-    state["sensor_data"] = sensor_data
-    state["risk_score"] = risk_score
-    state["risk_level"] = risk_level
-    state["anomalies"] = anomalies
-    state["requires_escalation"] = risk_score >= config.escalation_threshold
+    # Recommandation LLM (optionnelle), seulement s'il y a quelque chose à recommander
+    recommendation = None
+    if config.llm_enabled and anomalies:
+        recommendation = await perceptron_recommendation(risk_level, anomalies)
     
     # Audit log
-    state["audit_log"].append({
-        "agent": "Perceptron",
-        "action": "analysis_complete",
-        "risk_score": risk_score,
-        "anomalies_count": len(anomalies),
-        "timestamp": datetime.now().isoformat()
-    })
+    await _audit_write(
+        state["session_id"],
+        "Perceptron",
+        "analysis_complete",
+        ts,
+        risk_score=risk_score,
+        anomalies_count=len(anomalies)
+    )
     
     logger.info(f"👁️ Perceptron: Score={risk_score}, Level={risk_level}, Anomalies={len(anomalies)}")
     
-    return state
+    # Mise à jour de l'état (delta). Les résultats du cycle précédent sont
+    # remis à zéro: regénérés par la branche actions, vides si le cycle
+    # prend le chemin rapide (voir route_perception)
+    return {
+        "sensor_data": sensor_data,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "anomalies": anomalies,
+        "recommendation": recommendation,
+        "requires_escalation": risk_score >= config.escalation_threshold,
+        "plan": [],
+        "tasks": [],
+        "actions_taken": []
+    }
 
 
 # -----------------------------------------------------------------------------
@@ -545,7 +857,7 @@ Utilité = Risque × Impact × Urgence
 }
 """
 
-async def agent_planificateur(state: AgentState) -> AgentState:
+async def agent_planificateur(state: AgentState) -> Dict[str, Any]:
     """Agent Planificateur - Décomposition et priorisation"""
     logger.info("🧠 Agent Planificateur: Création du plan...")
     
@@ -567,9 +879,9 @@ async def agent_planificateur(state: AgentState) -> AgentState:
     
     # Actions pour chaque anomalie
     for i, anomaly in enumerate(anomalies):
-        severity = anomaly.get("severity", "warning")
-        sensor = anomaly.get("sensor", "unknown")
-        location = anomaly.get("location", "Unknown")
+        severity = anomaly.severity
+        sensor = anomaly.sensor
+        location = anomaly.location
         
         if severity == "critical":
             plan.extend([
@@ -603,31 +915,44 @@ async def agent_planificateur(state: AgentState) -> AgentState:
                 "params": {"channel": "teams", "severity": "warning", "message": f"WARNING: {sensor} approche seuil à {location}"}
             })
     
-    # Toujours mettre à jour le KG
-    plan.append({
-        "step": len(plan) + 1,
-        "action": "update_knowledge_graph",
-        "description": "Mise à jour Knowledge Graph",
-        "priority": "P3",
-        "deadline": "10min",
-        "tool": "update_knowledge_graph",
-        "params": {"entity_type": "AnalysisEvent", "entity_id": state.get("session_id", "unknown"), "properties": {"risk_score": risk_score, "anomalies": len(anomalies)}}
-    })
-    
-    state["plan"] = plan
-    state["tasks"] = plan.copy()
-    
-    # Audit log
-    state["audit_log"].append({
-        "agent": "Planificateur",
-        "action": "plan_created",
-        "steps_count": len(plan),
-        "timestamp": datetime.now().isoformat()
-    })
+    # La mise à jour KG de l'analyse est faite en parallèle (agent_apprenant_kg)
+    # L'audit du plan est écrit par agent_planificateur_audit, hors cache
     
     logger.info(f"🧠 Planificateur: Plan créé avec {len(plan)} étapes")
     
-    return state
+    # Seules les clés produites sont retournées: le nœud est mis en cache
+    return {"plan": plan, "tasks": plan.copy()}
+
+
+async def agent_planificateur_audit(state: AgentState) -> Dict[str, Any]:
+    """
+    Trace d'audit du plan. Nœud non mis en cache: l'événement plan_created
+    est écrit à chaque cycle, y compris quand le plan vient du cache.
+    """
+    await _audit_write(
+        state["session_id"],
+        "Planificateur",
+        "plan_created",
+        _now().isoformat(),
+        steps_count=len(state.get("plan", []))
+    )
+    return {}
+
+
+def planificateur_cache_key(state: AgentState) -> str:
+    """
+    Clé de cache du Planificateur: le plan ne dépend que du score et de la
+    signature des anomalies (capteur, sévérité, lieu), pas de la session.
+    """
+    signature = {
+        "r": state.get("risk_score", 0),
+        "e": bool(state.get("requires_escalation")),
+        "a": [
+            (a.sensor, a.severity, a.location)
+            for a in state.get("anomalies", [])
+        ]
+    }
+    return hashlib.blake2b(orjson.dumps(signature, option=orjson.OPT_SORT_KEYS)).hexdigest()
 
 
 # -----------------------------------------------------------------------------
@@ -653,12 +978,14 @@ Exécuter les actions du plan de manière fiable et traçable.
 - control_plc (stop/emergency): ❌ Escalade obligatoire
 """
 
-async def agent_executeur(state: AgentState) -> AgentState:
+async def agent_executeur(state: AgentState) -> Dict[str, Any]:
     """Agent Exécuteur - Exécution des actions"""
     logger.info("⚡ Agent Exécuteur: Exécution du plan...")
+    ts = _now().isoformat()
     
-    actions_taken = []
     tasks = state.get("tasks", [])
+    autoexec = []
+    pending = []
     
     for task in tasks:
         tool_name = task.get("tool")
@@ -668,49 +995,52 @@ async def agent_executeur(state: AgentState) -> AgentState:
         # Vérifier si escalade nécessaire
         if action == "escalade_humaine":
             logger.warning("⚠️ ESCALADE REQUISE - En attente décision humaine")
-            state["actions_pending"].append(task)
+            pending.append(task)
             continue
         
         # Actions PLC critiques = escalade
         if tool_name == "control_plc" and params.get("command") in ["stop", "emergency_stop"]:
             logger.warning(f"⚠️ Action PLC critique bloquée: {params.get('command')}")
-            state["actions_pending"].append(task)
+            pending.append(task)
             continue
         
-        # Exécuter l'outil
-        result = None
-        if tool_name == "send_alert":
-            result = send_alert.invoke(params)
-        elif tool_name == "generate_report":
-            result = generate_report.invoke(params)
-        elif tool_name == "update_knowledge_graph":
-            result = update_knowledge_graph.invoke(params)
-        elif tool_name == "control_plc":
-            result = control_plc.invoke(params)
-        
+        if tool_name in TOOL_MAP:
+            autoexec.append(task)
+    
+    # Exécuter les outils autonomes en parallèle (appels I/O indépendants)
+    results = await asyncio.gather(
+        *(TOOL_MAP[task["tool"]].ainvoke(task.get("params", {})) for task in autoexec),
+        return_exceptions=True
+    )
+    
+    actions_taken = []
+    for task, result in zip(autoexec, results):
+        action = task.get("action")
+        if isinstance(result, Exception):
+            logger.error(f"❌ Action échouée: {action}: {result}")
+            continue
         if result:
             actions_taken.append({
                 "task": task,
                 "result": result,
-                "executed_at": datetime.now().isoformat(),
+                "executed_at": ts,
                 "status": "success"
             })
             logger.info(f"⚡ Action exécutée: {action}")
     
-    state["actions_taken"] = actions_taken
-    
     # Audit log
-    state["audit_log"].append({
-        "agent": "Executeur",
-        "action": "execution_complete",
-        "actions_success": len(actions_taken),
-        "actions_pending": len(state.get("actions_pending", [])),
-        "timestamp": datetime.now().isoformat()
-    })
+    await _audit_write(
+        state["session_id"],
+        "Executeur",
+        "execution_complete",
+        ts,
+        actions_success=len(actions_taken),
+        actions_pending=len(state.get("actions_pending", [])) + len(pending)
+    )
     
     logger.info(f"⚡ Exécuteur: {len(actions_taken)} actions exécutées")
     
-    return state
+    return {"actions_taken": actions_taken, "actions_pending": pending}
 
 
 # -----------------------------------------------------------------------------
@@ -735,21 +1065,25 @@ Analyser les résultats des actions et mettre à jour le Knowledge Graph et les
 - Taux de faux positifs
 """
 
-async def agent_apprenant(state: AgentState) -> AgentState:
+async def agent_apprenant(state: AgentState) -> Dict[str, Any]:
     """Agent Apprenant - Apprentissage et amélioration"""
     logger.info("📚 Agent Apprenant: Analyse des résultats...")
+    ts = _now().isoformat()
     
     actions_taken = state.get("actions_taken", [])
+    session_id = state.get("session_id", "unknown")
+    iteration = state.get("iteration", 0)
     kg_updates = []
     
     # Analyser les patterns
-    for action in actions_taken:
+    for i, action in enumerate(actions_taken):
         task = action.get("task", {})
         result = action.get("result", {})
         
         # Créer entrée KG pour chaque action
         kg_updates.append({
-            "type": "ActionRecord",
+            "entity_type": "ActionRecord",
+            "entity_id": f"{session_id}:{iteration}:{i}",
             "properties": {
                 "action_type": task.get("action"),
                 "risk_score": state.get("risk_score"),
@@ -769,21 +1103,54 @@ async def agent_apprenant(state: AgentState) -> AgentState:
         "loa_achieved": 4 if not state.get("requires_escalation") else 3
     }
     
-    state["kg_updates"] = kg_updates
-    state["feedback"].append(session_metrics)
+    # Une seule écriture KG pour toutes les actions (UNWIND côté Neo4j)
+    if kg_updates:
+        await update_knowledge_graph.ainvoke({"entities": kg_updates})
     
     # Audit log
-    state["audit_log"].append({
-        "agent": "Apprenant",
-        "action": "learning_complete",
-        "kg_updates": len(kg_updates),
-        "metrics": session_metrics,
-        "timestamp": datetime.now().isoformat()
-    })
+    await _audit_write(
+        state["session_id"],
+        "Apprenant",
+        "learning_complete",
+        ts,
+        kg_updates=len(kg_updates),
+        metrics=session_metrics
+    )
     
     logger.info(f"📚 Apprenant: {len(kg_updates)} mises à jour KG")
     
-    return state
+    return {"kg_updates": kg_updates, "feedback": [session_metrics]}
+
+
+async def agent_apprenant_kg(state: AgentState) -> Dict[str, Any]:
+    """
+    Agent Apprenant (branche parallèle) - Enregistrement de l'analyse.
+    
+    Exécuté en parallèle du Planificateur/Exécuteur: l'événement d'analyse
+    ne dépend que du Perceptron et sort ainsi du chemin critique des alertes.
+    """
+    logger.info("📚 Agent Apprenant: Enregistrement de l'analyse dans le KG...")
+    ts = _now().isoformat()
+    
+    result = await update_knowledge_graph.ainvoke({"entities": [{
+        "entity_type": "AnalysisEvent",
+        "entity_id": state.get("session_id", "unknown"),
+        "properties": {
+            "risk_score": state.get("risk_score", 0),
+            "anomalies": len(state.get("anomalies", []))
+        }
+    }]})
+    
+    # Audit log
+    await _audit_write(
+        state["session_id"],
+        "Apprenant",
+        "analysis_recorded",
+        ts,
+        entity_id=result["entity_ids"][0]
+    )
+    
+    return {"analysis_event": result}
 
 
 # -----------------------------------------------------------------------------
@@ -807,29 +1174,31 @@ Coordonner les agents, gérer les escalades et assurer la conformité LOA 4.
 - Score > 85: ESCALADE OBLIGATOIRE
 """
 
-async def agent_superviseur(state: AgentState) -> AgentState:
+async def agent_superviseur(state: AgentState) -> Dict[str, Any]:
     """Agent Superviseur - Orchestration et contrôle"""
     logger.info("👔 Agent Superviseur: Vérification état...")
+    ts = _now().isoformat()
     
     risk_score = state.get("risk_score", 0)
     iteration = state.get("iteration", 0) + 1
-    state["iteration"] = iteration
+    human_decision = state.get("human_decision")
     
     # Décision de routage
-    if state.get("requires_escalation") and not state.get("human_decision"):
+    if state.get("requires_escalation") and not human_decision:
         logger.critical(f"🚨 ESCALADE: Score {risk_score} > {config.escalation_threshold}")
         # En prod: notification Slack/PagerDuty et attente réponse
-        state["human_decision"] = "acknowledged"  # Simulation
+        human_decision = "acknowledged"  # Simulation
     
     # Audit final de session
-    state["audit_log"].append({
-        "agent": "Superviseur",
-        "action": "session_complete",
-        "iteration": iteration,
-        "final_risk_score": risk_score,
-        "escalated": state.get("requires_escalation", False),
-        "timestamp": datetime.now().isoformat()
-    })
+    await _audit_write(
+        state["session_id"],
+        "Superviseur",
+        "session_complete",
+        ts,
+        iteration=iteration,
+        final_risk_score=risk_score,
+        escalated=state.get("requires_escalation", False)
+    )
     
     # Métriques LOA
     loa_metrics = {
@@ -843,44 +1212,128 @@ async def agent_superviseur(state: AgentState) -> AgentState:
     
     logger.info(f"👔 Superviseur: Session terminée - LOA={loa_metrics['loa_achieved']}")
     
-    return state
+    return {"iteration": iteration, "human_decision": human_decision}
 
 
 # =============================================================================
 # GRAPHE D'ORCHESTRATION (LangGraph)
 # =============================================================================
 
-def should_continue(state: AgentState) -> Literal["continue", "escalate", "end"]:
-    """Décide si la boucle doit continuer"""
-    if state.get("requires_escalation") and not state.get("human_decision"):
+# Issues du Superviseur (clés des arêtes conditionnelles)
+NextStep = Literal["continue", "escalate", "end"]
+
+
+def _route(escalation: bool, human_decision: bool, max_iterations: bool, low_risk: bool) -> NextStep:
+    """Règles de routage du Superviseur (évaluées une fois, voir _NEXT_STEP)"""
+    if escalation and not human_decision:
         return "escalate"
-    if state.get("iteration", 0) >= 5:
+    if max_iterations:
         return "end"
-    if state.get("risk_level") in ["low", "moderate"]:
+    if low_risk:
         return "end"
     return "continue"
 
 
+# Table de décision indexée par
+# (escalade << 3 | décision humaine << 2 | itération >= 5 << 1 | risque faible/modéré)
+_NEXT_STEP: Tuple[NextStep, ...] = tuple(
+    _route(bool(key & 8), bool(key & 4), bool(key & 2), bool(key & 1))
+    for key in range(16)
+)
+_LOW_RISK_LEVELS = frozenset(("low", "moderate"))
+
+
+def route_perception(state: AgentState) -> Literal["fast", "slow"]:
+    """Régime nominal (risque faible, aucune anomalie): saut direct au Superviseur"""
+    if state.get("risk_level") == "low" and not state.get("anomalies"):
+        return "fast"
+    return "slow"
+
+
+def should_continue(state: AgentState) -> NextStep:
+    """Décide si la boucle doit continuer"""
+    key = (
+        bool(state.get("requires_escalation")) << 3
+        | bool(state.get("human_decision")) << 2
+        | (state.get("iteration", 0) >= 5) << 1
+        | (state.get("risk_level") in _LOW_RISK_LEVELS)
+    )
+    return _NEXT_STEP[key]
+
+
+class BoundedInMemoryCache(InMemoryCache):
+    """
+    Cache mémoire LangGraph borné: au-delà de maxsize entrées par espace de
+    noms, les plus anciennes sont évincées (les entrées expirées le sont
+    déjà à la lecture, via le ttl de la CachePolicy).
+    """
+    
+    def __init__(self, maxsize: int, **kwargs):
+        super().__init__(**kwargs)
+        self.maxsize = maxsize
+    
+    def set(self, keys) -> None:
+        with self._lock:
+            # Réécriture d'une clé existante: elle redevient la plus récente
+            for ns, key in keys:
+                self._cache.get(ns, {}).pop(key, None)
+            super().set(keys)
+            for ns, _ in keys:
+                entries = self._cache[ns]
+                while len(entries) > self.maxsize:
+                    del entries[next(iter(entries))]
+
+
+@lru_cache(maxsize=1)
 def create_agentic_graph() -> StateGraph:
-    """Crée le graphe d'orchestration multi-agents"""
+    """
+    Crée le graphe d'orchestration multi-agents.
+    
+    La topologie est statique: le graphe compilé est mis en cache et
+    partagé entre les sessions (l'état circule via ainvoke).
+    """
     
     workflow = StateGraph(AgentState)
     
     # Ajouter les nœuds (agents)
     workflow.add_node("perceptron", agent_perceptron)
-    workflow.add_node("planificateur", agent_planificateur)
+    workflow.add_node(
+        "planificateur",
+        agent_planificateur,
+        cache_policy=CachePolicy(
+            key_func=planificateur_cache_key,
+            ttl=config.planner_cache_ttl_seconds
+        )
+    )
+    workflow.add_node("planificateur_audit", agent_planificateur_audit)
     workflow.add_node("executeur", agent_executeur)
     workflow.add_node("apprenant", agent_apprenant)
-    workflow.add_node("superviseur", agent_superviseur)
+    workflow.add_node("apprenant_kg", agent_apprenant_kg)
+    # Superviseur différé: attend la fin des deux branches
+    workflow.add_node("superviseur", agent_superviseur, defer=True)
     
     # Définir le flux
     workflow.set_entry_point("perceptron")
     
-    workflow.add_edge("perceptron", "planificateur")
-    workflow.add_edge("planificateur", "executeur")
+    # Branche actions: planification → exécution → apprentissage
+    # (court-circuitée en régime nominal)
+    workflow.add_conditional_edges(
+        "perceptron",
+        route_perception,
+        {
+            "fast": "superviseur",
+            "slow": "planificateur"
+        }
+    )
+    workflow.add_edge("planificateur", "planificateur_audit")
+    workflow.add_edge("planificateur_audit", "executeur")
     workflow.add_edge("executeur", "apprenant")
     workflow.add_edge("apprenant", "superviseur")
     
+    # Branche KG: enregistrement de l'analyse en parallèle
+    workflow.add_edge("perceptron", "apprenant_kg")
+    workflow.add_edge("apprenant_kg", "superviseur")
+    
     # Conditions de sortie
     workflow.add_conditional_edges(
         "superviseur",
@@ -892,7 +1345,7 @@ def create_agentic_graph() -> StateGraph:
         }
     )
     
-    return workflow.compile()
+    return workflow.compile(cache=BoundedInMemoryCache(config.planner_cache_size))
 
 
 # =============================================================================
@@ -905,11 +1358,16 @@ class SafeTwinAgentique:
     def __init__(self):
         self.graph = create_agentic_graph()
         self.logger = logging.getLogger("SafeTwinAgentique")
-        self.sessions: Dict[str, AgentState] = {}
+        self.sessions: OrderedDict[str, AgentState] = OrderedDict()
+        # Agrégats incrémentaux sur toutes les sessions, y compris celles
+        # évincées de self.sessions (get_metrics en O(1))
+        self._session_count = 0
+        self._risk_sum = 0.0
+        self._escalations = 0
     
     def create_initial_state(self) -> AgentState:
         """Crée un état initial pour une nouvelle session"""
-        session_id = hashlib.md5(str(datetime.now()).encode()).hexdigest()[:12]
+        session_id = uuid.uuid4().hex[:12]
         
         return AgentState(
             sensor_data={},
@@ -923,12 +1381,13 @@ class SafeTwinAgentique:
             actions_pending=[],
             feedback=[],
             kg_updates=[],
+            analysis_event=None,
             requires_escalation=False,
             human_decision=None,
+            recommendation=None,
             iteration=0,
-            audit_log=[],
             session_id=session_id,
-            timestamp=datetime.now().isoformat()
+            timestamp=_now().isoformat()
         )
     
     async def run_cycle(self) -> AgentState:
@@ -942,8 +1401,14 @@ class SafeTwinAgentique:
         # Exécuter le graphe
         final_state = await self.graph.ainvoke(initial_state)
         
-        # Stocker la session
+        # Stocker la session (rétention bornée: les plus anciennes sont évincées)
         self.sessions[final_state["session_id"]] = final_state
+        while len(self.sessions) > config.max_sessions:
+            self.sessions.popitem(last=False)
+        self._session_count += 1
+        self._risk_sum += final_state.get("risk_score", 0)
+        if final_state.get("requires_escalation"):
+            self._escalations += 1
         
         # Résumé
         self.logger.info("=" * 60)
@@ -961,22 +1426,38 @@ class SafeTwinAgentique:
         """Exécute la surveillance en continu"""
         self.logger.info(f"🔄 Mode continu activé (intervalle: {interval_seconds}s)")
         
-        while True:
-            try:
-                await self.run_cycle()
-            except Exception as e:
-                self.logger.error(f"Erreur cycle: {e}")
-            
-            await asyncio.sleep(interval_seconds)
+        # Cadence fixe: l'attente est calée sur l'échéance du prochain cycle,
+        # la durée d'exécution d'un cycle ne s'ajoute donc pas à l'intervalle
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        
+        try:
+            while True:
+                next_tick += interval_seconds
+                try:
+                    await self.run_cycle()
+                except Exception as e:
+                    self.logger.error(f"Erreur cycle: {e}")
+                
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # Cycle plus long que l'intervalle: on repart de maintenant
+                    self.logger.warning(f"⏱️ Cycle en dépassement de {-delay:.1f}s")
+                    next_tick = loop.time()
+        finally:
+            # Arrêt (annulation, erreur): vider la file d'audit avant de rendre la main
+            await flush_audit()
     
     def get_metrics(self) -> Dict[str, Any]:
         """Retourne les métriques globales du système"""
-        if not self.sessions:
+        if not self._session_count:
             return {"status": "no_sessions"}
         
-        total_sessions = len(self.sessions)
-        escalations = sum(1 for s in self.sessions.values() if s.get("requires_escalation"))
-        avg_risk = sum(s.get("risk_score", 0) for s in self.sessions.values()) / total_sessions
+        total_sessions = self._session_count
+        escalations = self._escalations
+        avg_risk = self._risk_sum / total_sessions
         
         return {
             "total_sessions": total_sessions,
@@ -1011,18 +1492,32 @@ async def main():
     safetwin = SafeTwinAgentique()
     
     # Exécuter un cycle de démo
-    result = await safetwin.run_cycle()
+    try:
+        result = await safetwin.run_cycle()
+    finally:
+        await aclose_http_client()
     
     # Afficher métriques
     metrics = safetwin.get_metrics()
     print("\n📈 MÉTRIQUES:")
     print(json.dumps(metrics, indent=2))
     
-    # Afficher audit log
-    print("\n📝 AUDIT LOG:")
-    for entry in result.get("audit_log", []):
-        print(f"   [{entry['agent']}] {entry['action']} @ {entry['timestamp']}")
+    # Afficher audit log de la session
+    await flush_audit()
+    print(f"\n📝 AUDIT LOG ({config.audit_log_path}):")
+    with open(config.audit_log_path, "rb") as fh:
+        for line in fh:
+            entry = orjson.loads(line)
+            if entry.get("session_id") == result["session_id"]:
+                print(f"   [{entry['agent']}] {entry['action']} @ {entry['timestamp']}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Boucle uvloop (libuv) si disponible, sinon boucle asyncio standard
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
@@ -20,15 +20,24 @@ Conformité: Vision Zero, LMRSST Québec, ISO 45001
 """
 
 import os
-import json
+import operator
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional, TypedDict
+from typing import Annotated, Deque, Dict, Iterator, List, Any, Mapping, Optional, Sequence, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import hashlib
-import uuid
+import secrets
+from collections import Counter, OrderedDict, defaultdict, deque
+from weakref import WeakKeyDictionary
+from functools import lru_cache
+from types import MappingProxyType
+
+import aiohttp
+import numpy as np
+import orjson
 
 # LangGraph
 from langgraph.graph import StateGraph, END
@@ -40,11 +49,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SafeTwinDigitalTwin")
 
+# Horloge locale (méthode liée une fois: évite la résolution d'attribut à chaque horodatage)
+_now = datetime.now
+
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
+# Connecteurs SGSST (table partagée, en lecture seule)
+SGSST_SOURCES = MappingProxyType({
+    "intellect": {
+        "type": "rest_api",
+        "base_url": "https://api.intellect.com/v1",
+        "auth": "oauth2",
+        "data_types": ["audits", "risks", "analytics"]
+    },
+    "conformit_ai": {
+        "type": "rest_api", 
+        "base_url": "https://api.conformit.ai/v2",
+        "auth": "api_key",
+        "data_types": ["permits", "confined_spaces", "inspections"]
+    },
+    "medial_plus": {
+        "type": "rest_api",
+        "base_url": "https://api.medialplus.com/v1",
+        "auth": "bearer",
+        "data_types": ["prevention_plans", "incidents", "training"]
+    },
+    "sharepoint": {
+        "type": "graph_api",
+        "base_url": "https://graph.microsoft.com/v1.0",
+        "auth": "oauth2",
+        "data_types": ["documents", "approvals", "workflows"]
+    },
+    "sigma_rh": {
+        "type": "rest_api",
+        "base_url": "https://api.sigma-rh.com/v1",
+        "auth": "api_key",
+        "data_types": ["near_miss", "mobile_inspections", "iot"]
+    },
+    "tervene": {
+        "type": "rest_api",
+        "base_url": "https://api.tervene.com/v1",
+        "auth": "api_key",
+        "data_types": ["field_observations", "safety_walks"]
+    }
+})
+
+
 @dataclass
 class DigitalTwinConfig:
     """Configuration du système Digital Twin"""
@@ -54,44 +107,18 @@ class DigitalTwinConfig:
     neo4j_uri: str = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     
     # SGSST Connectors
-    sgsst_sources: Dict[str, Dict] = field(default_factory=lambda: {
-        "intellect": {
-            "type": "rest_api",
-            "base_url": "https://api.intellect.com/v1",
-            "auth": "oauth2",
-            "data_types": ["audits", "risks", "analytics"]
-        },
-        "conformit_ai": {
-            "type": "rest_api", 
-            "base_url": "https://api.conformit.ai/v2",
-            "auth": "api_key",
-            "data_types": ["permits", "confined_spaces", "inspections"]
-        },
-        "medial_plus": {
-            "type": "rest_api",
-            "base_url": "https://api.medialplus.com/v1",
-            "auth": "bearer",
-            "data_types": ["prevention_plans", "incidents", "training"]
-        },
-        "sharepoint": {
-            "type": "graph_api",
-            "base_url": "https://graph.microsoft.com/v1.0",
-            "auth": "oauth2",
-            "data_types": ["documents", "approvals", "workflows"]
-        },
-        "sigma_rh": {
-            "type": "rest_api",
-            "base_url": "https://api.sigma-rh.com/v1",
-            "auth": "api_key",
-            "data_types": ["near_miss", "mobile_inspections", "iot"]
-        },
-        "tervene": {
-            "type": "rest_api",
-            "base_url": "https://api.tervene.com/v1",
-            "auth": "api_key",
-            "data_types": ["field_observations", "safety_walks"]
-        }
-    })
+    sgsst_sources: Mapping[str, Dict] = field(default_factory=lambda: SGSST_SOURCES)
+    
+    # Requêtes SGSST simultanées maximum (toutes sources confondues)
+    max_concurrent_fetches: int = 8
+    # Appels réels aux API SGSST (sinon données simulées)
+    sgsst_live: bool = os.getenv("SGSST_LIVE", "0") == "1"
+    sgsst_timeout_seconds: float = 5.0
+    
+    # Audit: entrées conservées par session (les plus anciennes sont évincées)
+    audit_log_maxlen: int = 512
+    # Twins conservés en mémoire par le hub (les moins récemment utilisés sont évincés)
+    max_twins: int = 128
     
     # Ontologie CNESST/IRSST
     ontology_version: str = "2.0"
@@ -137,12 +164,28 @@ class DataType(Enum):
     EQUIPMENT = "equipment"
 
 
-class TwinState(TypedDict):
-    """État partagé entre les agents Digital Twin"""
+def append_audit(log: Deque[Dict], entries: List[Dict]) -> Deque[Dict]:
+    """Réducteur du journal d'audit: ajoute les entrées en gardant la borne config.audit_log_maxlen"""
+    if log is None or log.maxlen != config.audit_log_maxlen:
+        log = deque(log or (), maxlen=config.audit_log_maxlen)
+    log.extend(entries)
+    return log
+
+
+@dataclass(slots=True)
+class TwinState:
+    """
+    État partagé entre les agents Digital Twin.
+    
+    Dataclass à slots: les agents lisent des attributs (pas de recherche
+    par clé) et retournent des dicts partiels que LangGraph fusionne.
+    Le résultat de graph.ainvoke reste un dict de ces mêmes champs.
+    """
     
     # Session
     session_id: str
     timestamp: str
+    perf_start: float  # time.perf_counter() à la création (durée de traitement)
     
     # Données brutes ingérées
     raw_data: List[Dict]
@@ -150,7 +193,6 @@ class TwinState(TypedDict):
     data_type: str
     
     # Données normalisées
-    normalized_entities: List[Dict]
     risks: List[Dict]
     zones: List[Dict]
     equipment: List[Dict]
@@ -158,144 +200,280 @@ class TwinState(TypedDict):
     # SafetyGraph
     kg_nodes_created: int
     kg_relationships_created: int
-    cypher_queries: List[str]
+    cypher_queries: List[Tuple[str, Dict]]  # (requête UNWIND, paramètres)
     
     # Digital Twin
     twin_id: str
     twin_version: int
     spatial_elements: List[Dict]
+    risk_coords: np.ndarray      # (N, 3) float32, alignée sur risks
+    risk_severity: np.ndarray    # (N,) int8, codes SEVERITY_TO_INT
     risk_heatmap: Dict
+    risk_heatmap_critical_total: int  # somme des cellules "critical" (calculée à la construction)
     
     # Playbooks
-    playbooks_generated: List[Dict]
+    playbooks_generated: Annotated[List[Dict], operator.add]
     recommendations: List[str]
     
     # Audit
-    audit_log: List[Dict]
+    # Les agents retournent uniquement leurs entrées; append_audit les fusionne
+    audit_log: Annotated[Deque[Dict], append_audit]  # bornée à config.audit_log_maxlen entrées
     processing_time_ms: int
 
 
+@dataclass(slots=True)
+class TwinSummary:
+    """Résumé d'un twin conservé par le hub (list_twins / iter_twins)"""
+    twin_id: str
+    version: int
+    risks: int
+    zones: int
+
+
 # =============================================================================
 # OUTILS SGSST
 # =============================================================================
 
-async def fetch_from_intellect(endpoint: str, params: Dict = None) -> Dict:
+# Session HTTP partagée (pool keep-alive, cache DNS) pour toutes les sources.
+# Créée à la première requête: aiohttp exige une boucle d'événements active.
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Retourne la session HTTP partagée (créée au premier appel)"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=config.sgsst_timeout_seconds)
+        )
+    return _http_session
+
+
+async def aclose_http_session():
+    """Ferme la session HTTP partagée (arrêt de l'application)"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+async def sgsst_get(source: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """GET JSON sur une source SGSST via la session partagée (document JSON décodé)"""
+    base_url = config.sgsst_sources[source]["base_url"]
+    async with get_http_session().get(f"{base_url}/{path}", params=params) as resp:
+        resp.raise_for_status()
+        return await resp.json(loads=orjson.loads)
+
+
+# Données simulées (hors mode live): constantes en lecture seule, construites
+# une fois à l'import plutôt qu'à chaque appel. Figées en profondeur
+# (dicts → MappingProxyType, listes → tuples): partagées entre appelants
+# sans copie, elles ne peuvent pas être modifiées par l'un d'eux
+
+def _freeze(obj: Any) -> Any:
+    """Copie en lecture seule, récursive, d'une structure JSON"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(value) for value in obj)
+    return obj
+
+
+_NO_RECORDS: Tuple[Mapping[str, Any], ...] = ()
+
+_INTELLECT_MOCK: Mapping[str, Tuple[Mapping[str, Any], ...]] = _freeze({
+    "audits": [
+        {
+            "id": "AUD-001",
+            "date": "2026-01-15",
+            "site": "Chantier Montreal Nord",
+            "findings": [
+                {"type": "risk", "category": "RC1", "description": "Garde-corps manquant niveau 3"},
+                {"type": "risk", "category": "RC3", "description": "Protection scie circulaire défectueuse"}
+            ],
+            "score": 72
+        }
+    ],
+    "risks": [
+        {"id": "RSK-101", "category": "RC1_CHUTES_HAUTEUR", "zone": "Zone B", "severity": "high"},
+        {"id": "RSK-102", "category": "RC6_ELECTRICITE", "zone": "Zone A", "severity": "medium"}
+    ]
+})
+
+
+_CONFORMIT_MOCK: Mapping[str, Tuple[Mapping[str, Any], ...]] = _freeze({
+    "permits": [
+        {
+            "id": "PER-2026-001",
+            "type": "confined_space",
+            "location": "Réservoir R-101",
+            "status": "active",
+            "risks": ["RC5_ESPACES_CLOS", "RC7_CHIMIQUE_BIO"],
+            "valid_until": "2026-01-16T18:00:00"
+        }
+    ],
+    "inspections": [
+        {
+            "id": "INS-2026-015",
+            "date": "2026-01-15",
+            "inspector": "Jean Tremblay",
+            "zone": "Atelier Soudure",
+            "items_checked": 45,
+            "non_conformities": 3
+        }
+    ]
+})
+
+
+_SHAREPOINT_MOCK: Mapping[str, Any] = _freeze({
+    "documents": [
+        {
+            "id": "DOC-SP-001",
+            "name": "Programme_Prevention_2026.pdf",
+            "path": "/sites/HSE/Documents/Programmes",
+            "modified": "2026-01-10",
+            "content_type": "application/pdf"
+        },
+        {
+            "id": "DOC-SP-002", 
+            "name": "Plan_Urgence_Incendie.pdf",
+            "path": "/sites/HSE/Documents/Urgences",
+            "modified": "2026-01-05",
+            "content_type": "application/pdf"
+        }
+    ]
+})
+
+
+_PARSED_DOC_MOCK: Mapping[str, Any] = _freeze({
+    "risks_found": [
+        {
+            "description": "Travaux en hauteur sans harnais",
+            "category": "RC1_CHUTES_HAUTEUR",
+            "location": "Toiture bâtiment principal",
+            "coordinates": {"x": 45.5, "y": 12.3, "z": 8.0},
+            "severity": "critical"
+        },
+        {
+            "description": "Exposition au bruit >85dB",
+            "category": "RC8_ERGONOMIE_TMS",
+            "location": "Atelier usinage",
+            "coordinates": {"x": 20.0, "y": 30.0, "z": 0.0},
+            "severity": "high"
+        }
+    ],
+    "zones_found": [
+        {"name": "Zone A - Administration", "type": "office", "risk_level": "low"},
+        {"name": "Zone B - Production", "type": "industrial", "risk_level": "high"},
+        {"name": "Zone C - Stockage", "type": "warehouse", "risk_level": "medium"}
+    ],
+    "equipment_found": [
+        {"id": "EQP-001", "name": "Pont roulant 10T", "zone": "Zone B", "last_inspection": "2025-12-15"},
+        {"id": "EQP-002", "name": "Chariot élévateur", "zone": "Zone C", "last_inspection": "2026-01-02"}
+    ]
+})
+
+
+async def fetch_from_intellect(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Sequence[Mapping[str, Any]]:
     """Fetch données depuis Intellect SGSST"""
-    logger.info(f"📥 Intellect API: {endpoint}")
-    
-    # Simulation - En prod: vrai appel API
-    mock_data = {
-        "audits": [
-            {
-                "id": "AUD-001",
-                "date": "2026-01-15",
-                "site": "Chantier Montreal Nord",
-                "findings": [
-                    {"type": "risk", "category": "RC1", "description": "Garde-corps manquant niveau 3"},
-                    {"type": "risk", "category": "RC3", "description": "Protection scie circulaire défectueuse"}
-                ],
-                "score": 72
-            }
-        ],
-        "risks": [
-            {"id": "RSK-101", "category": "RC1_CHUTES_HAUTEUR", "zone": "Zone B", "severity": "high"},
-            {"id": "RSK-102", "category": "RC6_ELECTRICITE", "zone": "Zone A", "severity": "medium"}
-        ]
-    }
-    return mock_data.get(endpoint, {})
+    logger.info("📥 Intellect API: %s", endpoint)
+    
+    if config.sgsst_live:
+        return await sgsst_get("intellect", endpoint, params)
+    
+    # Simulation
+    return _INTELLECT_MOCK.get(endpoint, _NO_RECORDS)
 
 
-async def fetch_from_conformit(endpoint: str, params: Dict = None) -> Dict:
+async def fetch_from_conformit(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Sequence[Mapping[str, Any]]:
     """Fetch données depuis CONFORMiT.ai"""
-    logger.info(f"📥 CONFORMiT.ai API: {endpoint}")
-    
-    mock_data = {
-        "permits": [
-            {
-                "id": "PER-2026-001",
-                "type": "confined_space",
-                "location": "Réservoir R-101",
-                "status": "active",
-                "risks": ["RC5_ESPACES_CLOS", "RC7_CHIMIQUE_BIO"],
-                "valid_until": "2026-01-16T18:00:00"
-            }
-        ],
-        "inspections": [
-            {
-                "id": "INS-2026-015",
-                "date": "2026-01-15",
-                "inspector": "Jean Tremblay",
-                "zone": "Atelier Soudure",
-                "items_checked": 45,
-                "non_conformities": 3
-            }
-        ]
-    }
-    return mock_data.get(endpoint, {})
+    logger.info("📥 CONFORMiT.ai API: %s", endpoint)
+    
+    if config.sgsst_live:
+        return await sgsst_get("conformit_ai", endpoint, params)
+    
+    # Simulation
+    return _CONFORMIT_MOCK.get(endpoint, _NO_RECORDS)
 
 
-async def fetch_from_sharepoint(library: str) -> Dict:
+async def fetch_from_sharepoint(library: str) -> Mapping[str, Any]:
     """Fetch documents depuis SharePoint"""
-    logger.info(f"📥 SharePoint: {library}")
-    
-    mock_data = {
-        "documents": [
-            {
-                "id": "DOC-SP-001",
-                "name": "Programme_Prevention_2026.pdf",
-                "path": "/sites/HSE/Documents/Programmes",
-                "modified": "2026-01-10",
-                "content_type": "application/pdf"
-            },
-            {
-                "id": "DOC-SP-002", 
-                "name": "Plan_Urgence_Incendie.pdf",
-                "path": "/sites/HSE/Documents/Urgences",
-                "modified": "2026-01-05",
-                "content_type": "application/pdf"
-            }
-        ]
-    }
-    return mock_data
+    logger.info("📥 SharePoint: %s", library)
+    
+    if config.sgsst_live:
+        return await sgsst_get("sharepoint", f"sites/root/lists/{library}/items")
+    
+    # Simulation
+    return _SHAREPOINT_MOCK
 
 
 async def parse_document(doc_path: str) -> Dict:
     """Parse un document PDF/BIM et extrait les entités HSE"""
-    logger.info(f"📄 Parsing document: {doc_path}")
+    logger.info("📄 Parsing document: %s", doc_path)
     
     # Simulation extraction IA - En prod: utiliser Claude/GPT pour extraction
     extracted = {
-        "document_id": hashlib.md5(doc_path.encode()).hexdigest()[:8],
+        "document_id": hashlib.blake2b(doc_path.encode(), digest_size=4).hexdigest(),
         "title": doc_path.split("/")[-1],
-        "risks_found": [
-            {
-                "description": "Travaux en hauteur sans harnais",
-                "category": "RC1_CHUTES_HAUTEUR",
-                "location": "Toiture bâtiment principal",
-                "coordinates": {"x": 45.5, "y": 12.3, "z": 8.0},
-                "severity": "critical"
-            },
-            {
-                "description": "Exposition au bruit >85dB",
-                "category": "RC8_ERGONOMIE_TMS",
-                "location": "Atelier usinage",
-                "coordinates": {"x": 20.0, "y": 30.0, "z": 0.0},
-                "severity": "high"
-            }
-        ],
-        "zones_found": [
-            {"name": "Zone A - Administration", "type": "office", "risk_level": "low"},
-            {"name": "Zone B - Production", "type": "industrial", "risk_level": "high"},
-            {"name": "Zone C - Stockage", "type": "warehouse", "risk_level": "medium"}
-        ],
-        "equipment_found": [
-            {"id": "EQP-001", "name": "Pont roulant 10T", "zone": "Zone B", "last_inspection": "2025-12-15"},
-            {"id": "EQP-002", "name": "Chariot élévateur", "zone": "Zone C", "last_inspection": "2026-01-02"}
-        ]
+        **_PARSED_DOC_MOCK
     }
     return extracted
 
 
+# Borne la concurrence des appels SGSST (sockets, quotas des API). Un
+# sémaphore par boucle d'événements: un asyncio.Semaphore se lie à la boucle
+# qui l'utilise en premier, et chaque asyncio.run crée une nouvelle boucle
+_sgsst_sems: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _sgsst_semaphore() -> asyncio.Semaphore:
+    """Sémaphore de concurrence SGSST de la boucle courante (créé au premier appel)"""
+    loop = asyncio.get_running_loop()
+    sem = _sgsst_sems.get(loop)
+    if sem is None:
+        sem = _sgsst_sems[loop] = asyncio.Semaphore(config.max_concurrent_fetches)
+    return sem
+
+
+async def _guarded(coro):
+    """Exécute un appel SGSST sous le sémaphore de concurrence"""
+    async with _sgsst_semaphore():
+        return await coro
+
+
+async def ingest_intellect() -> Dict:
+    """Extraction Intellect: audits et risques en parallèle"""
+    audits, risks = await asyncio.gather(
+        _guarded(fetch_from_intellect("audits")),
+        _guarded(fetch_from_intellect("risks"))
+    )
+    return {"audits": audits, "risks": risks}
+
+
+async def ingest_conformit() -> Dict:
+    """Extraction CONFORMiT.ai: permis et inspections en parallèle"""
+    permits, inspections = await asyncio.gather(
+        _guarded(fetch_from_conformit("permits")),
+        _guarded(fetch_from_conformit("inspections"))
+    )
+    return {"permits": permits, "inspections": inspections}
+
+
+async def ingest_sharepoint() -> Dict:
+    """Extraction SharePoint: bibliothèque documentaire HSE"""
+    return await _guarded(fetch_from_sharepoint("HSE"))
+
+
+# Sources SGSST interrogées par le connecteur:
+# nom → (libellé, coroutine d'extraction, message de succès)
+SOURCE_FETCHERS = {
+    "intellect": ("Intellect", ingest_intellect, "Données extraites"),
+    "conformit_ai": ("CONFORMiT.ai", ingest_conformit, "Données extraites"),
+    "sharepoint": ("SharePoint", ingest_sharepoint, "Documents listés"),
+}
+
+
 # =============================================================================
 # AGENT 1: SGSST CONNECTOR
 # =============================================================================
@@ -318,81 +496,64 @@ RÈGLES:
 4. Retourner données brutes avec métadonnées source
 """
 
-async def agent_sgsst_connector(state: TwinState) -> TwinState:
+async def agent_sgsst_connector(state: TwinState) -> Dict[str, Any]:
     """Agent qui connecte et extrait depuis les SGSST"""
     logger.info("🔌 Agent SGSSTConnector: Ingestion multi-sources...")
     
-    start_time = datetime.now()
+    now_iso = _now().isoformat()
     raw_data = []
     
-    source = state.get("source", "all")
-    
-    # Intellect
-    if source in ["all", "intellect"]:
-        try:
-            audits = await fetch_from_intellect("audits")
-            risks = await fetch_from_intellect("risks")
-            raw_data.append({
-                "source": "intellect",
-                "timestamp": datetime.now().isoformat(),
-                "data": {"audits": audits, "risks": risks}
-            })
-            logger.info("✅ Intellect: Données extraites")
-        except Exception as e:
-            logger.error(f"❌ Intellect: {e}")
-    
-    # CONFORMiT.ai
-    if source in ["all", "conformit_ai"]:
-        try:
-            permits = await fetch_from_conformit("permits")
-            inspections = await fetch_from_conformit("inspections")
-            raw_data.append({
-                "source": "conformit_ai",
-                "timestamp": datetime.now().isoformat(),
-                "data": {"permits": permits, "inspections": inspections}
-            })
-            logger.info("✅ CONFORMiT.ai: Données extraites")
-        except Exception as e:
-            logger.error(f"❌ CONFORMiT.ai: {e}")
-    
-    # SharePoint Documents
-    if source in ["all", "sharepoint"]:
-        try:
-            docs = await fetch_from_sharepoint("HSE")
-            raw_data.append({
-                "source": "sharepoint",
-                "timestamp": datetime.now().isoformat(),
-                "data": docs
-            })
-            logger.info("✅ SharePoint: Documents listés")
-        except Exception as e:
-            logger.error(f"❌ SharePoint: {e}")
+    source = state.source
+    
+    # Sources SGSST interrogées en parallèle: la latence totale est celle
+    # de la source la plus lente; une source en échec n'interrompt pas les autres
+    if source == "all":
+        selected = tuple(SOURCE_FETCHERS)
+    elif source in SOURCE_FETCHERS:
+        selected = (source,)
+    else:
+        selected = ()
+    
+    results = await asyncio.gather(
+        *(SOURCE_FETCHERS[name][1]() for name in selected),
+        return_exceptions=True
+    )
+    
+    for name, data in zip(selected, results):
+        label, _, done_msg = SOURCE_FETCHERS[name]
+        if isinstance(data, Exception):
+            logger.error(f"❌ {label}: {data}")
+            continue
+        raw_data.append({
+            "source": name,
+            "timestamp": now_iso,
+            "data": data
+        })
+        logger.info("✅ %s: %s", label, done_msg)
     
     # Document Upload (si fourni)
-    if state.get("data_type") == "document_upload":
-        doc_path = state.get("raw_data", [{}])[0].get("path", "")
+    if state.data_type == "document_upload":
+        doc_path = (state.raw_data or [{}])[0].get("path", "")
         if doc_path:
             extracted = await parse_document(doc_path)
             raw_data.append({
                 "source": "document_upload",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "data": extracted
             })
-            logger.info(f"✅ Document parsé: {doc_path}")
-    
-    state["raw_data"] = raw_data
+            logger.info("✅ Document parsé: %s", doc_path)
     
     # Audit log
-    state["audit_log"].append({
+    audit_entry = {
         "agent": "SGSSTConnector",
         "action": "ingestion_complete",
         "sources_processed": len(raw_data),
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": now_iso
+    }
     
-    logger.info(f"🔌 SGSSTConnector: {len(raw_data)} sources ingérées")
+    logger.info("🔌 SGSSTConnector: %s sources ingérées", len(raw_data))
     
-    return state
+    return {"raw_data": raw_data, "audit_log": [audit_entry]}
 
 
 # =============================================================================
@@ -411,16 +572,25 @@ ONTOLOGIE CNESST/IRSST:
 OUTPUT: Nœuds et relations prêts pour Neo4j
 """
 
-async def agent_data_normalizer(state: TwinState) -> TwinState:
+def _hex_tokens(chunk: int = 256):
+    """Jetons hex de 8 caractères, tirés par lots d'un seul appel os.urandom"""
+    while True:
+        hexbuf = os.urandom(4 * chunk).hex()
+        for i in range(0, 8 * chunk, 8):
+            yield hexbuf[i:i + 8]
+
+
+async def agent_data_normalizer(state: TwinState) -> Dict[str, Any]:
     """Agent qui normalise vers ontologie SafetyGraph"""
     logger.info("📊 Agent DataNormalizer: Normalisation ontologie CNESST...")
+    now_iso = _now().isoformat()
+    new_token = _hex_tokens().__next__
     
-    normalized_entities = []
-    risks = []
-    zones = []
-    equipment = []
+    risks: List[Dict[str, Any]] = []
+    zones: List[Dict[str, Any]] = []
+    equipment: List[Dict[str, Any]] = []
     
-    for source_data in state.get("raw_data", []):
+    for source_data in state.raw_data:
         source = source_data.get("source", "unknown")
         data = source_data.get("data", {})
         
@@ -428,104 +598,106 @@ async def agent_data_normalizer(state: TwinState) -> TwinState:
         if source == "intellect":
             # Audits → Risques
             for audit in data.get("audits", []):
+                audit_id = audit.get("id")
+                site = audit.get("site", "")
+                date_detected = audit.get("date")
+                
                 for finding in audit.get("findings", []):
+                    category = finding.get("category", "RC0_AUTRE")
                     risk = {
-                        "id": f"RSK-{uuid.uuid4().hex[:8]}",
+                        "id": f"RSK-{new_token()}",
                         "source": "intellect",
-                        "source_id": audit.get("id"),
-                        "category": finding.get("category", "RC0_AUTRE"),
+                        "source_id": audit_id,
+                        "category": category,
                         "description": finding.get("description", ""),
                         "severity": "high" if finding.get("type") == "risk" else "medium",
-                        "site": audit.get("site", ""),
-                        "date_detected": audit.get("date"),
+                        "site": site,
+                        "date_detected": date_detected,
                         "status": "open",
-                        "cnesst_code": finding.get("category", "").split("_")[0]
+                        "cnesst_code": category.partition("_")[0]
                     }
                     risks.append(risk)
-                    normalized_entities.append({"type": "Risk", "data": risk})
         
         elif source == "conformit_ai":
             # Permis → Risques + Zones
             for permit in data.get("permits", []):
+                permit_id = permit.get("id")
+                permit_type = permit.get("type", "")
+                valid_until = permit.get("valid_until")
+                
                 zone = {
-                    "id": f"ZON-{uuid.uuid4().hex[:8]}",
+                    "id": f"ZON-{new_token()}",
                     "name": permit.get("location", ""),
-                    "type": permit.get("type", ""),
-                    "risk_level": "high" if "confined" in permit.get("type", "") else "medium",
-                    "active_permits": [permit.get("id")]
+                    "type": permit_type,
+                    "risk_level": "high" if "confined" in permit_type else "medium",
+                    "active_permits": [permit_id]
                 }
                 zones.append(zone)
-                normalized_entities.append({"type": "Zone", "data": zone})
                 
+                zone_id = zone["id"]
+                description = f"Risque lié au permis {permit.get('type')}"
                 for risk_cat in permit.get("risks", []):
                     risk = {
-                        "id": f"RSK-{uuid.uuid4().hex[:8]}",
+                        "id": f"RSK-{new_token()}",
                         "source": "conformit_ai",
-                        "source_id": permit.get("id"),
+                        "source_id": permit_id,
                         "category": risk_cat,
-                        "description": f"Risque lié au permis {permit.get('type')}",
-                        "zone_id": zone["id"],
+                        "description": description,
+                        "zone_id": zone_id,
                         "severity": "high",
-                        "valid_until": permit.get("valid_until")
+                        "valid_until": valid_until
                     }
                     risks.append(risk)
-                    normalized_entities.append({"type": "Risk", "data": risk})
         
         elif source == "document_upload":
             # Document → Risques + Zones + Équipements
-            for risk_data in data.get("risks_found", []):
-                risk = {
-                    "id": f"RSK-{uuid.uuid4().hex[:8]}",
+            document_id = data.get("document_id")
+            risks.extend(
+                {
+                    "id": f"RSK-{new_token()}",
                     "source": "document",
-                    "source_id": data.get("document_id"),
+                    "source_id": document_id,
                     "category": risk_data.get("category"),
                     "description": risk_data.get("description"),
                     "severity": risk_data.get("severity"),
                     "coordinates": risk_data.get("coordinates"),
                     "location_name": risk_data.get("location")
                 }
-                risks.append(risk)
-                normalized_entities.append({"type": "Risk", "data": risk})
-            
-            for zone_data in data.get("zones_found", []):
-                zone = {
-                    "id": f"ZON-{uuid.uuid4().hex[:8]}",
+                for risk_data in data.get("risks_found", [])
+            )
+            zones.extend(
+                {
+                    "id": f"ZON-{new_token()}",
                     "name": zone_data.get("name"),
                     "type": zone_data.get("type"),
                     "risk_level": zone_data.get("risk_level")
                 }
-                zones.append(zone)
-                normalized_entities.append({"type": "Zone", "data": zone})
-            
-            for equip_data in data.get("equipment_found", []):
-                equip = {
+                for zone_data in data.get("zones_found", [])
+            )
+            equipment.extend(
+                {
                     "id": equip_data.get("id"),
                     "name": equip_data.get("name"),
                     "zone": equip_data.get("zone"),
                     "last_inspection": equip_data.get("last_inspection"),
                     "status": "active"
                 }
-                equipment.append(equip)
-                normalized_entities.append({"type": "Equipment", "data": equip})
-    
-    state["normalized_entities"] = normalized_entities
-    state["risks"] = risks
-    state["zones"] = zones
-    state["equipment"] = equipment
+                for equip_data in data.get("equipment_found", [])
+            )
     
     # Audit log
-    state["audit_log"].append({
+    audit_entry = {
         "agent": "DataNormalizer",
         "action": "normalization_complete",
         "risks_count": len(risks),
         "zones_count": len(zones),
         "equipment_count": len(equipment),
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": now_iso
+    }
     
-    logger.info(f"📊 DataNormalizer: {len(risks)} risques, {len(zones)} zones, {len(equipment)} équipements")
+    logger.info("📊 DataNormalizer: %s risques, %s zones, %s équipements", len(risks), len(zones), len(equipment))
     
-    return state
+    return {"risks": risks, "zones": zones, "equipment": equipment, "audit_log": [audit_entry]}
 
 
 # =============================================================================
@@ -545,68 +717,98 @@ RESPONSABILITÉS:
 OUTPUT: Twin ID + version + éléments spatiaux
 """
 
-async def agent_twin_builder(state: TwinState) -> TwinState:
+# Codes de sévérité des vues colonnes (tri/comparaison numériques)
+SEVERITY_TO_INT = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Couleur des marqueurs de risque par sévérité (jaune par défaut)
+_SEVERITY_COLOR = {"critical": "#FF0000", "high": "#FFA500", "medium": "#FFFF00", "low": "#00FF00"}
+
+# Cellule vide de la heatmap (copiée pour chaque catégorie)
+_HEATMAP_CELL = {"count": 0, "critical": 0, "high": 0, "medium": 0, "low": 0}
+
+
+# Requêtes Cypher paramétrées: une requête UNWIND par type d'entité
+# (un aller-retour Neo4j et un plan d'exécution mis en cache par lot)
+ZONE_MERGE_CYPHER = """
+UNWIND $zones AS z
+MERGE (n:Zone {id: z.id})
+SET n += z, n.twin_id = $twin_id, n.updated_at = datetime()
+"""
+
+RISK_MERGE_CYPHER = """
+UNWIND $risks AS r
+MERGE (n:Risk {id: r.id})
+SET n += r, n.twin_id = $twin_id, n.updated_at = datetime()
+"""
+
+RISK_ZONE_LINK_CYPHER = """
+UNWIND $links AS l
+MATCH (r:Risk {id: l.risk_id}), (z:Zone {id: l.zone_id})
+MERGE (r)-[:LOCATED_IN]->(z)
+"""
+
+EQUIPMENT_MERGE_CYPHER = """
+UNWIND $equipment AS e
+MERGE (n:Equipment {id: e.id})
+SET n += e, n.twin_id = $twin_id, n.updated_at = datetime()
+"""
+
+
+async def agent_twin_builder(state: TwinState) -> Dict[str, Any]:
     """Agent qui construit le Digital Twin"""
     logger.info("🏗️ Agent TwinBuilder: Construction du jumeau numérique...")
+    now_iso = _now().isoformat()
     
-    twin_id = state.get("twin_id") or f"TWIN-{uuid.uuid4().hex[:8]}"
-    twin_version = state.get("twin_version", 0) + 1
+    # Identifiant attribué par create_initial_state (partagé avec PlaybookGenerator)
+    twin_id = state.twin_id
+    twin_version = state.twin_version + 1
     
-    cypher_queries = []
-    spatial_elements = []
-    nodes_created = 0
-    rels_created = 0
-    
-    # Créer les nœuds Zone dans Neo4j
-    for zone in state.get("zones", []):
-        cypher = f"""
-        MERGE (z:Zone {{id: '{zone["id"]}'}})
-        SET z.name = '{zone.get("name", "")}',
-            z.type = '{zone.get("type", "")}',
-            z.risk_level = '{zone.get("risk_level", "medium")}',
-            z.twin_id = '{twin_id}',
-            z.updated_at = datetime()
-        RETURN z
-        """
-        cypher_queries.append(cypher)
-        nodes_created += 1
-        
-        spatial_elements.append({
+    zones = state.zones
+    risks = state.risks
+    equipment = state.equipment
+    
+    # Nœuds Zone
+    zone_rows = [
+        {
+            "id": zone["id"],
+            "name": zone.get("name", ""),
+            "type": zone.get("type", ""),
+            "risk_level": zone.get("risk_level", "medium")
+        }
+        for zone in zones
+    ]
+    zone_elements = [
+        {
             "type": "zone",
             "id": zone["id"],
             "name": zone.get("name"),
             "risk_level": zone.get("risk_level"),
             "geometry": "polygon"
-        })
+        }
+        for zone in zones
+    ]
     
-    # Créer les nœuds Risk et lier aux Zones
-    for risk in state.get("risks", []):
-        cypher = f"""
-        MERGE (r:Risk {{id: '{risk["id"]}'}})
-        SET r.category = '{risk.get("category", "")}',
-            r.description = '{risk.get("description", "").replace("'", "''")}',
-            r.severity = '{risk.get("severity", "medium")}',
-            r.source = '{risk.get("source", "")}',
-            r.status = '{risk.get("status", "open")}',
-            r.twin_id = '{twin_id}',
-            r.updated_at = datetime()
-        RETURN r
-        """
-        cypher_queries.append(cypher)
-        nodes_created += 1
-        
-        # Lier Risk → Zone si zone_id existe
-        if risk.get("zone_id"):
-            cypher_rel = f"""
-            MATCH (r:Risk {{id: '{risk["id"]}'}}), (z:Zone {{id: '{risk["zone_id"]}'}})
-            MERGE (r)-[:LOCATED_IN]->(z)
-            """
-            cypher_queries.append(cypher_rel)
-            rels_created += 1
-        
-        # Élément spatial avec coordonnées 3D
-        coords = risk.get("coordinates", {})
-        spatial_elements.append({
+    # Nœuds Risk et liens vers les Zones (si zone_id existe)
+    risk_rows = [
+        {
+            "id": risk["id"],
+            "category": risk.get("category", ""),
+            "description": risk.get("description", ""),
+            "severity": risk.get("severity", "medium"),
+            "source": risk.get("source", ""),
+            "status": risk.get("status", "open")
+        }
+        for risk in risks
+    ]
+    link_rows = [
+        {"risk_id": risk["id"], "zone_id": risk["zone_id"]}
+        for risk in risks
+        if risk.get("zone_id")
+    ]
+    
+    # Éléments spatiaux des risques avec coordonnées 3D
+    risk_elements = [
+        {
             "type": "risk_marker",
             "id": risk["id"],
             "category": risk.get("category"),
@@ -616,54 +818,78 @@ async def agent_twin_builder(state: TwinState) -> TwinState:
                 "y": coords.get("y", 0),
                 "z": coords.get("z", 0)
             },
-            "color": "#FF0000" if risk.get("severity") == "critical" else "#FFA500" if risk.get("severity") == "high" else "#FFFF00"
-        })
+            "color": _SEVERITY_COLOR.get(risk.get("severity", ""), "#FFFF00")
+        }
+        for risk in risks
+        for coords in (risk.get("coordinates", {}),)
+    ]
     
-    # Créer les nœuds Equipment
-    for equip in state.get("equipment", []):
-        cypher = f"""
-        MERGE (e:Equipment {{id: '{equip["id"]}'}})
-        SET e.name = '{equip.get("name", "")}',
-            e.zone = '{equip.get("zone", "")}',
-            e.last_inspection = '{equip.get("last_inspection", "")}',
-            e.status = '{equip.get("status", "active")}',
-            e.twin_id = '{twin_id}',
-            e.updated_at = datetime()
-        RETURN e
-        """
-        cypher_queries.append(cypher)
-        nodes_created += 1
-        
-        spatial_elements.append({
+    # Nœuds Equipment
+    equipment_rows = [
+        {
+            "id": equip["id"],
+            "name": equip.get("name", ""),
+            "zone": equip.get("zone", ""),
+            "last_inspection": equip.get("last_inspection", ""),
+            "status": equip.get("status", "active")
+        }
+        for equip in equipment
+    ]
+    equipment_elements = [
+        {
             "type": "equipment",
             "id": equip["id"],
             "name": equip.get("name"),
             "zone": equip.get("zone"),
             "icon": "machine"
-        })
+        }
+        for equip in equipment
+    ]
     
-    # Générer heatmap de risques
-    risk_heatmap = {}
-    for risk in state.get("risks", []):
-        category = risk.get("category", "OTHER")
-        severity = risk.get("severity", "medium")
-        
-        if category not in risk_heatmap:
-            risk_heatmap[category] = {"count": 0, "critical": 0, "high": 0, "medium": 0, "low": 0}
-        
-        risk_heatmap[category]["count"] += 1
-        risk_heatmap[category][severity] += 1
+    spatial_elements = zone_elements + risk_elements + equipment_elements
     
-    state["twin_id"] = twin_id
-    state["twin_version"] = twin_version
-    state["cypher_queries"] = cypher_queries
-    state["kg_nodes_created"] = nodes_created
-    state["kg_relationships_created"] = rels_created
-    state["spatial_elements"] = spatial_elements
-    state["risk_heatmap"] = risk_heatmap
+    # Vues colonnes des risques (calculs géométriques, rasterisation heatmap)
+    risk_coords = np.asarray(
+        [
+            (coords.get("x", 0), coords.get("y", 0), coords.get("z", 0))
+            for coords in (risk.get("coordinates", {}) for risk in risks)
+        ],
+        dtype=np.float32
+    ).reshape(-1, 3)
+    risk_severity = np.fromiter(
+        (SEVERITY_TO_INT.get(risk.get("severity", "medium"), 1) for risk in risks),
+        dtype=np.int8,
+        count=len(risks)
+    )
+    
+    # Requêtes par lot (query, params): les valeurs passent en paramètres,
+    # jamais dans le texte Cypher
+    cypher_queries = []
+    if zone_rows:
+        cypher_queries.append((ZONE_MERGE_CYPHER, {"zones": zone_rows, "twin_id": twin_id}))
+    if risk_rows:
+        cypher_queries.append((RISK_MERGE_CYPHER, {"risks": risk_rows, "twin_id": twin_id}))
+    if link_rows:
+        cypher_queries.append((RISK_ZONE_LINK_CYPHER, {"links": link_rows}))
+    if equipment_rows:
+        cypher_queries.append((EQUIPMENT_MERGE_CYPHER, {"equipment": equipment_rows, "twin_id": twin_id}))
+    
+    nodes_created = len(zone_rows) + len(risk_rows) + len(equipment_rows)
+    rels_created = len(link_rows)
+    
+    # Générer heatmap de risques (comptages par catégorie et par sévérité)
+    cat_counts = Counter(risk.get("category", "OTHER") for risk in risks)
+    cs_counts = Counter((risk.get("category", "OTHER"), risk.get("severity", "medium")) for risk in risks)
+    
+    risk_heatmap = {category: {**_HEATMAP_CELL, "count": count} for category, count in cat_counts.items()}
+    critical_total = 0
+    for (category, severity), count in cs_counts.items():
+        risk_heatmap[category][severity] = count
+        if severity == "critical":
+            critical_total += count
     
     # Audit log
-    state["audit_log"].append({
+    audit_entry = {
         "agent": "TwinBuilder",
         "action": "twin_built",
         "twin_id": twin_id,
@@ -671,12 +897,26 @@ async def agent_twin_builder(state: TwinState) -> TwinState:
         "nodes_created": nodes_created,
         "relationships_created": rels_created,
         "spatial_elements": len(spatial_elements),
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": now_iso
+    }
     
-    logger.info(f"🏗️ TwinBuilder: Twin {twin_id} v{twin_version} - {nodes_created} nœuds, {len(spatial_elements)} éléments spatiaux")
+    logger.info("🏗️ TwinBuilder: Twin %s v%s - %s nœuds, %s éléments spatiaux", twin_id, twin_version, nodes_created, len(spatial_elements))
     
-    return state
+    # Branche parallèle au PlaybookGenerator: seules les clés produites
+    # sont retournées (clés disjointes, audit_log fusionné par son réducteur)
+    return {
+        "twin_id": twin_id,
+        "twin_version": twin_version,
+        "cypher_queries": cypher_queries,
+        "kg_nodes_created": nodes_created,
+        "kg_relationships_created": rels_created,
+        "spatial_elements": spatial_elements,
+        "risk_coords": risk_coords,
+        "risk_severity": risk_severity,
+        "risk_heatmap": risk_heatmap,
+        "risk_heatmap_critical_total": critical_total,
+        "audit_log": [audit_entry]
+    }
 
 
 # =============================================================================
@@ -700,128 +940,146 @@ AUTO-APPRENTISSAGE:
 - Optimiser séquences d'actions
 """
 
-async def agent_playbook_generator(state: TwinState) -> TwinState:
+# Modèles de playbooks par catégorie CNESST (constants: construits une seule fois,
+# figés en lecture seule; chaque playbook reçoit sa propre copie des actions)
+_PLAYBOOK_TEMPLATES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "RC1_CHUTES_HAUTEUR": MappingProxyType({
+        "title": "Playbook Prévention Chutes de Hauteur",
+        "triggers": ("Travaux > 3m", "Échafaudage", "Toiture", "Échelle"),
+        "actions": (
+            MappingProxyType({"step": 1, "action": "Vérifier EPI (harnais, longe, point d'ancrage)", "responsible": "Superviseur"}),
+            MappingProxyType({"step": 2, "action": "Inspecter garde-corps et protections collectives", "responsible": "Préventeur"}),
+            MappingProxyType({"step": 3, "action": "Former travailleurs sur procédure sécuritaire", "responsible": "Formateur HSE"}),
+            MappingProxyType({"step": 4, "action": "Délimiter zone de travail", "responsible": "Chef d'équipe"}),
+            MappingProxyType({"step": 5, "action": "Documenter dans registre SST", "responsible": "Coordonnateur"})
+        ),
+        "references": ("RSST art. 346-354", "LMRSST art. 51", "Vision Zero - Chutes")
+    }),
+    "RC5_ESPACES_CLOS": MappingProxyType({
+        "title": "Playbook Entrée Espaces Clos",
+        "triggers": ("Permis espace clos actif", "Réservoir", "Cuve", "Tunnel"),
+        "actions": (
+            MappingProxyType({"step": 1, "action": "Émettre permis d'entrée", "responsible": "Superviseur qualifié"}),
+            MappingProxyType({"step": 2, "action": "Tester atmosphère (O2, LEL, H2S, CO)", "responsible": "Entrant qualifié"}),
+            MappingProxyType({"step": 3, "action": "Positionner surveillant à l'entrée", "responsible": "Surveillant"}),
+            MappingProxyType({"step": 4, "action": "Vérifier équipement de sauvetage", "responsible": "Équipe secours"}),
+            MappingProxyType({"step": 5, "action": "Communication continue pendant travaux", "responsible": "Tous"})
+        ),
+        "references": ("RSST art. 297-310", "CSA Z1006", "LMRSST art. 51.3")
+    }),
+    "RC3_MACHINES": MappingProxyType({
+        "title": "Playbook Sécurité Machines",
+        "triggers": ("Maintenance machine", "Cadenassage", "Déblocage"),
+        "actions": (
+            MappingProxyType({"step": 1, "action": "Appliquer procédure LOTO (Lock Out Tag Out)", "responsible": "Opérateur"}),
+            MappingProxyType({"step": 2, "action": "Vérifier absence d'énergie résiduelle", "responsible": "Électricien"}),
+            MappingProxyType({"step": 3, "action": "Installer protecteurs avant remise en marche", "responsible": "Mécanicien"}),
+            MappingProxyType({"step": 4, "action": "Test fonctionnel sécuritaire", "responsible": "Superviseur"}),
+            MappingProxyType({"step": 5, "action": "Documenter intervention", "responsible": "Maintenance"})
+        ),
+        "references": ("RSST art. 185-195", "CSA Z460", "LMRSST art. 51")
+    }),
+    "RC8_ERGONOMIE_TMS": MappingProxyType({
+        "title": "Playbook Prévention TMS",
+        "triggers": ("Manutention répétitive", "Postures contraignantes", "Vibrations"),
+        "actions": (
+            MappingProxyType({"step": 1, "action": "Évaluer poste avec grille OSHA/NIOSH", "responsible": "Ergonome"}),
+            MappingProxyType({"step": 2, "action": "Implanter aides mécaniques", "responsible": "Ingénieur"}),
+            MappingProxyType({"step": 3, "action": "Former aux techniques de manutention", "responsible": "Formateur"}),
+            MappingProxyType({"step": 4, "action": "Organiser rotation des tâches", "responsible": "Superviseur"}),
+            MappingProxyType({"step": 5, "action": "Suivi médical préventif", "responsible": "SST"})
+        ),
+        "references": ("RSST art. 166-170", "Guide IRSST TMS", "Vision Zero - Ergonomie")
+    })
+})
+
+async def agent_playbook_generator(state: TwinState) -> Dict[str, Any]:
     """Agent qui génère les playbooks auto-apprenants"""
     logger.info("📚 Agent PlaybookGenerator: Génération playbooks...")
+    now_iso = _now().isoformat()
+    risks = state.risks
+    twin_id = state.twin_id
+    
+    # Aucun risque (mise à jour incrémentale sans nouveauté): rien à générer
+    if not risks:
+        logger.info("📚 PlaybookGenerator: aucun risque, génération ignorée")
+        return {
+            "playbooks_generated": [],
+            "recommendations": [],
+            "audit_log": [{"agent": "PlaybookGenerator", "action": "skipped_empty", "timestamp": now_iso}]
+        }
     
-    playbooks = []
+    playbooks: List[Dict[str, Any]] = []
     recommendations = []
-    
-    # Analyser les risques par catégorie
-    risk_by_category = {}
-    for risk in state.get("risks", []):
+    # Préfixe aléatoire tiré une fois par exécution, suffixé par un compteur
+    playbook_prefix = secrets.token_hex(3)
+    
+    # Regrouper les ids de risques par catégorie (comptage des critiques dans la même passe;
+    # la heatmap est produite en parallèle par le TwinBuilder)
+    ids_by_category = defaultdict(list)
+    critical_categories = set()
+    total_critical = 0
+    for risk in risks:
         cat = risk.get("category", "OTHER")
-        if cat not in risk_by_category:
-            risk_by_category[cat] = []
-        risk_by_category[cat].append(risk)
-    
-    # Générer playbook pour chaque catégorie à risque
-    playbook_templates = {
-        "RC1_CHUTES_HAUTEUR": {
-            "title": "Playbook Prévention Chutes de Hauteur",
-            "triggers": ["Travaux > 3m", "Échafaudage", "Toiture", "Échelle"],
-            "actions": [
-                {"step": 1, "action": "Vérifier EPI (harnais, longe, point d'ancrage)", "responsible": "Superviseur"},
-                {"step": 2, "action": "Inspecter garde-corps et protections collectives", "responsible": "Préventeur"},
-                {"step": 3, "action": "Former travailleurs sur procédure sécuritaire", "responsible": "Formateur HSE"},
-                {"step": 4, "action": "Délimiter zone de travail", "responsible": "Chef d'équipe"},
-                {"step": 5, "action": "Documenter dans registre SST", "responsible": "Coordonnateur"}
-            ],
-            "references": ["RSST art. 346-354", "LMRSST art. 51", "Vision Zero - Chutes"]
-        },
-        "RC5_ESPACES_CLOS": {
-            "title": "Playbook Entrée Espaces Clos",
-            "triggers": ["Permis espace clos actif", "Réservoir", "Cuve", "Tunnel"],
-            "actions": [
-                {"step": 1, "action": "Émettre permis d'entrée", "responsible": "Superviseur qualifié"},
-                {"step": 2, "action": "Tester atmosphère (O2, LEL, H2S, CO)", "responsible": "Entrant qualifié"},
-                {"step": 3, "action": "Positionner surveillant à l'entrée", "responsible": "Surveillant"},
-                {"step": 4, "action": "Vérifier équipement de sauvetage", "responsible": "Équipe secours"},
-                {"step": 5, "action": "Communication continue pendant travaux", "responsible": "Tous"}
-            ],
-            "references": ["RSST art. 297-310", "CSA Z1006", "LMRSST art. 51.3"]
-        },
-        "RC3_MACHINES": {
-            "title": "Playbook Sécurité Machines",
-            "triggers": ["Maintenance machine", "Cadenassage", "Déblocage"],
-            "actions": [
-                {"step": 1, "action": "Appliquer procédure LOTO (Lock Out Tag Out)", "responsible": "Opérateur"},
-                {"step": 2, "action": "Vérifier absence d'énergie résiduelle", "responsible": "Électricien"},
-                {"step": 3, "action": "Installer protecteurs avant remise en marche", "responsible": "Mécanicien"},
-                {"step": 4, "action": "Test fonctionnel sécuritaire", "responsible": "Superviseur"},
-                {"step": 5, "action": "Documenter intervention", "responsible": "Maintenance"}
-            ],
-            "references": ["RSST art. 185-195", "CSA Z460", "LMRSST art. 51"]
-        },
-        "RC8_ERGONOMIE_TMS": {
-            "title": "Playbook Prévention TMS",
-            "triggers": ["Manutention répétitive", "Postures contraignantes", "Vibrations"],
-            "actions": [
-                {"step": 1, "action": "Évaluer poste avec grille OSHA/NIOSH", "responsible": "Ergonome"},
-                {"step": 2, "action": "Implanter aides mécaniques", "responsible": "Ingénieur"},
-                {"step": 3, "action": "Former aux techniques de manutention", "responsible": "Formateur"},
-                {"step": 4, "action": "Organiser rotation des tâches", "responsible": "Superviseur"},
-                {"step": 5, "action": "Suivi médical préventif", "responsible": "SST"}
-            ],
-            "references": ["RSST art. 166-170", "Guide IRSST TMS", "Vision Zero - Ergonomie"]
-        }
-    }
+        ids_by_category[cat].append(risk["id"])
+        if risk.get("severity") == "critical":
+            total_critical += 1
+            critical_categories.add(cat)
     
-    for category, risks_list in risk_by_category.items():
-        template = playbook_templates.get(category)
+    # Recommandations globales (total connu après la passe de regroupement:
+    # la bannière est ajoutée en tête directement, sans insertion)
+    if total_critical > 0:
+        recommendations.append(f"🚨 {total_critical} risques CRITIQUES nécessitent action immédiate!")
+    
+    # Générer playbook pour chaque catégorie à risque (méthodes d'ajout liées une fois)
+    playbooks_append = playbooks.append
+    recs_append = recommendations.append
+    for category, risk_ids in ids_by_category.items():
+        risk_count = len(risk_ids)
+        template = _PLAYBOOK_TEMPLATES.get(category)
         
         if template:
             playbook = {
-                "id": f"PLB-{uuid.uuid4().hex[:8]}",
+                "id": f"PLB-{playbook_prefix}{len(playbooks):02x}",
                 "title": template["title"],
                 "category": category,
                 "triggers": template["triggers"],
-                "actions": template["actions"],
+                "actions": [dict(action) for action in template["actions"]],
                 "references": template["references"],
-                "risks_covered": [r["id"] for r in risks_list],
-                "risk_count": len(risks_list),
-                "priority": "P1" if len(risks_list) >= 3 or any(r.get("severity") == "critical" for r in risks_list) else "P2",
+                "risks_covered": risk_ids,
+                "risk_count": risk_count,
+                "priority": "P1" if risk_count >= 3 or category in critical_categories else "P2",
                 "auto_learning": {
-                    "last_update": datetime.now().isoformat(),
+                    "last_update": now_iso,
                     "effectiveness_score": 0.85,
                     "adjustments": []
                 },
-                "twin_id": state.get("twin_id"),
-                "generated_at": datetime.now().isoformat()
+                "twin_id": twin_id,
+                "generated_at": now_iso
             }
-            playbooks.append(playbook)
+            playbooks_append(playbook)
             
             # Générer recommandation
-            recommendations.append(
-                f"⚠️ {len(risks_list)} risques {category}: Appliquer '{template['title']}'"
+            recs_append(
+                f"⚠️ {risk_count} risques {category}: Appliquer '{template['title']}'"
             )
         else:
-            recommendations.append(
-                f"ℹ️ {len(risks_list)} risques {category}: Créer playbook personnalisé"
+            recs_append(
+                f"ℹ️ {risk_count} risques {category}: Créer playbook personnalisé"
             )
     
-    # Recommandations globales basées sur heatmap
-    heatmap = state.get("risk_heatmap", {})
-    total_critical = sum(h.get("critical", 0) for h in heatmap.values())
-    
-    if total_critical > 0:
-        recommendations.insert(0, f"🚨 {total_critical} risques CRITIQUES nécessitent action immédiate!")
-    
-    state["playbooks_generated"] = playbooks
-    state["recommendations"] = recommendations
-    
     # Audit log
-    state["audit_log"].append({
+    audit_entry = {
         "agent": "PlaybookGenerator",
         "action": "playbooks_generated",
         "playbooks_count": len(playbooks),
         "recommendations_count": len(recommendations),
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": now_iso
+    }
     
-    logger.info(f"📚 PlaybookGenerator: {len(playbooks)} playbooks, {len(recommendations)} recommandations")
+    logger.info("📚 PlaybookGenerator: %s playbooks, %s recommandations", len(playbooks), len(recommendations))
     
-    return state
+    return {"playbooks_generated": playbooks, "recommendations": recommendations, "audit_log": [audit_entry]}
 
 
 # =============================================================================
@@ -839,58 +1097,68 @@ RESPONSABILITÉS:
 4. Notifier les parties prenantes
 """
 
-async def agent_twin_orchestrator(state: TwinState) -> TwinState:
+# Synthèse finale: un seul enregistrement de log multiligne
+_SYNTHESIS_LOG = "\n".join((
+    "=" * 60,
+    "📊 SYNTHÈSE DIGITAL TWIN",
+    "   Twin ID: %s",
+    "   Version: %s",
+    "   Risques: %s",
+    "   Zones: %s",
+    "   Équipements: %s",
+    "   Playbooks: %s",
+    "   Temps: %sms",
+    "=" * 60
+))
+
+async def agent_twin_orchestrator(state: TwinState) -> Dict[str, Any]:
     """Agent orchestrateur principal"""
     logger.info("🎯 Agent TwinOrchestrator: Finalisation...")
     
-    # Calculer temps de traitement
-    start_time = datetime.fromisoformat(state.get("timestamp", datetime.now().isoformat()))
-    processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+    now_iso = _now().isoformat()
+    
+    # Calculer temps de traitement (horloge monotone, sans analyse ISO-8601)
+    processing_time = int((time.perf_counter() - state.perf_start) * 1000)
     
     # Synthèse
     summary = {
-        "session_id": state.get("session_id"),
-        "twin_id": state.get("twin_id"),
-        "twin_version": state.get("twin_version"),
-        "sources_ingested": len(state.get("raw_data", [])),
-        "total_risks": len(state.get("risks", [])),
-        "total_zones": len(state.get("zones", [])),
-        "total_equipment": len(state.get("equipment", [])),
-        "kg_nodes": state.get("kg_nodes_created", 0),
-        "kg_relationships": state.get("kg_relationships_created", 0),
-        "playbooks": len(state.get("playbooks_generated", [])),
+        "session_id": state.session_id,
+        "twin_id": state.twin_id,
+        "twin_version": state.twin_version,
+        "sources_ingested": len(state.raw_data),
+        "total_risks": len(state.risks),
+        "critical_risks": state.risk_heatmap_critical_total,
+        "total_zones": len(state.zones),
+        "total_equipment": len(state.equipment),
+        "kg_nodes": state.kg_nodes_created,
+        "kg_relationships": state.kg_relationships_created,
+        "playbooks": len(state.playbooks_generated),
         "processing_time_ms": processing_time,
         "status": "success"
     }
     
-    state["processing_time_ms"] = processing_time
-    
     # Audit log final
-    state["audit_log"].append({
+    audit_entry = {
         "agent": "TwinOrchestrator",
         "action": "orchestration_complete",
         "summary": summary,
-        "timestamp": datetime.now().isoformat()
-    })
+        "timestamp": now_iso
+    }
     
-    logger.info("=" * 60)
-    logger.info("📊 SYNTHÈSE DIGITAL TWIN")
-    logger.info(f"   Twin ID: {state.get('twin_id')}")
-    logger.info(f"   Version: {state.get('twin_version')}")
-    logger.info(f"   Risques: {len(state.get('risks', []))}")
-    logger.info(f"   Zones: {len(state.get('zones', []))}")
-    logger.info(f"   Équipements: {len(state.get('equipment', []))}")
-    logger.info(f"   Playbooks: {len(state.get('playbooks_generated', []))}")
-    logger.info(f"   Temps: {processing_time}ms")
-    logger.info("=" * 60)
+    logger.info(
+        _SYNTHESIS_LOG,
+        summary["twin_id"], summary["twin_version"], summary["total_risks"], summary["total_zones"],
+        summary["total_equipment"], summary["playbooks"], processing_time
+    )
     
-    return state
+    return {"processing_time_ms": processing_time, "audit_log": [audit_entry]}
 
 
 # =============================================================================
 # GRAPHE D'ORCHESTRATION
 # =============================================================================
 
+@lru_cache(maxsize=1)
 def create_digital_twin_graph() -> StateGraph:
     """Crée le graphe d'orchestration Digital Twin"""
     
@@ -903,11 +1171,17 @@ def create_digital_twin_graph() -> StateGraph:
     workflow.add_node("playbook_generator", agent_playbook_generator)
     workflow.add_node("twin_orchestrator", agent_twin_orchestrator)
     
-    # Flux linéaire
+    # Ingestion → normalisation
     workflow.set_entry_point("sgsst_connector")
     workflow.add_edge("sgsst_connector", "data_normalizer")
+    
+    # Construction du twin et génération des playbooks en parallèle
+    # (tous deux ne dépendent que des entités normalisées)
     workflow.add_edge("data_normalizer", "twin_builder")
-    workflow.add_edge("twin_builder", "playbook_generator")
+    workflow.add_edge("data_normalizer", "playbook_generator")
+    
+    # Jonction: l'orchestrateur attend les deux branches
+    workflow.add_edge("twin_builder", "twin_orchestrator")
     workflow.add_edge("playbook_generator", "twin_orchestrator")
     workflow.add_edge("twin_orchestrator", END)
     
@@ -918,12 +1192,26 @@ def create_digital_twin_graph() -> StateGraph:
 # INTERFACE PRINCIPALE
 # =============================================================================
 
+def _json_default(obj: Any) -> Any:
+    """Types de TwinState non natifs pour orjson (journal d'audit borné, données simulées figées)"""
+    if isinstance(obj, deque):
+        return list(obj)
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+
 class SafeTwinDigitalTwinHub:
     """Interface principale du système Digital Twin Agentique"""
     
     def __init__(self):
         self.graph = create_digital_twin_graph()
-        self.twins: Dict[str, TwinState] = {}
+        # Résultats de graph.ainvoke: dicts des champs de TwinState
+        self.twins: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+    
+    async def aclose(self):
+        """Libère les connexions HTTP vers les SGSST"""
+        await aclose_http_session()
     
     def create_initial_state(
         self,
@@ -933,85 +1221,137 @@ class SafeTwinDigitalTwinHub:
     ) -> TwinState:
         """Crée un état initial"""
         
-        session_id = f"DT-{uuid.uuid4().hex[:12]}"
+        session_id = f"DT-{secrets.token_hex(6)}"
+        # Identifiant du twin attribué dès la création: les branches
+        # parallèles (TwinBuilder, PlaybookGenerator) le référencent
+        twin_id = f"TWIN-{secrets.token_hex(4)}"
         
         state = TwinState(
             session_id=session_id,
-            timestamp=datetime.now().isoformat(),
+            timestamp=_now().isoformat(),
+            perf_start=time.perf_counter(),
             raw_data=[{"path": document_path}] if document_path else [],
             source=source,
             data_type="document_upload" if document_path else data_type,
-            normalized_entities=[],
             risks=[],
             zones=[],
             equipment=[],
             kg_nodes_created=0,
             kg_relationships_created=0,
             cypher_queries=[],
-            twin_id="",
+            twin_id=twin_id,
             twin_version=0,
             spatial_elements=[],
+            risk_coords=np.empty((0, 3), dtype=np.float32),
+            risk_severity=np.empty(0, dtype=np.int8),
             risk_heatmap={},
+            risk_heatmap_critical_total=0,
             playbooks_generated=[],
             recommendations=[],
-            audit_log=[],
+            audit_log=deque(maxlen=config.audit_log_maxlen),
             processing_time_ms=0
         )
         
         return state
     
-    async def ingest_from_sgsst(self, sources: List[str] = None) -> TwinState:
+    def _store_twin(self, result: Dict[str, Any]):
+        """Enregistre un twin (rétention LRU bornée à config.max_twins)"""
+        twin_id = result["twin_id"]
+        self.twins[twin_id] = result
+        self.twins.move_to_end(twin_id)
+        while len(self.twins) > config.max_twins:
+            self.twins.popitem(last=False)
+    
+    async def ingest_from_sgsst(self, sources: List[str] = None) -> Dict[str, Any]:
         """Ingérer depuis les SGSST configurés"""
         source = "all" if not sources else sources[0]
         state = self.create_initial_state(source=source)
         result = await self.graph.ainvoke(state)
-        self.twins[result["twin_id"]] = result
+        self._store_twin(result)
         return result
     
-    async def ingest_document(self, document_path: str) -> TwinState:
+    async def ingest_document(self, document_path: str) -> Dict[str, Any]:
         """Ingérer depuis un document PDF/BIM"""
         state = self.create_initial_state(document_path=document_path)
         result = await self.graph.ainvoke(state)
-        self.twins[result["twin_id"]] = result
+        self._store_twin(result)
         return result
     
-    async def update_twin(self, twin_id: str, source: str = "all") -> TwinState:
+    async def ingest_documents(self, document_paths: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Ingérer plusieurs documents en parallèle (au plus `concurrency` graphes simultanés).
+        
+        Un document en échec n'annule pas les autres: son entrée dans la liste
+        retournée (même ordre que document_paths) est {"document_path", "error"}.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _ingest(document_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.graph.ainvoke(self.create_initial_state(document_path=document_path))
+        
+        outcomes = await asyncio.gather(*(_ingest(path) for path in document_paths), return_exceptions=True)
+        # Enregistrement sans await: pas d'entrelacement possible sur self.twins
+        results: List[Dict[str, Any]] = []
+        for document_path, outcome in zip(document_paths, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                logger.error("❌ Ingestion document %s: %s", document_path, outcome)
+                results.append({"document_path": document_path, "error": str(outcome)})
+                continue
+            self._store_twin(outcome)
+            results.append(outcome)
+        return results
+    
+    async def update_twin(self, twin_id: str, source: str = "all") -> Dict[str, Any]:
         """Mettre à jour un twin existant"""
         existing = self.twins.get(twin_id)
         state = self.create_initial_state(source=source)
         
         if existing:
-            state["twin_id"] = twin_id
-            state["twin_version"] = existing.get("twin_version", 0)
+            state.twin_id = twin_id
+            state.twin_version = existing.get("twin_version", 0)
         
         result = await self.graph.ainvoke(state)
-        self.twins[result["twin_id"]] = result
+        self._store_twin(result)
         return result
     
-    def get_twin(self, twin_id: str) -> Optional[TwinState]:
+    def export_twin(self, twin_id: str) -> Optional[bytes]:
+        """Sérialiser un twin en JSON (orjson: tableaux numpy natifs, datetimes ISO)"""
+        twin = self.twins.get(twin_id)
+        if twin is None:
+            return None
+        return orjson.dumps(twin, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    def get_twin(self, twin_id: str) -> Optional[Dict[str, Any]]:
         """Récupérer un twin"""
-        return self.twins.get(twin_id)
+        twin = self.twins.get(twin_id)
+        if twin is not None:
+            self.twins.move_to_end(twin_id)
+        return twin
+    
+    def iter_twins(self) -> Iterator[TwinSummary]:
+        """Parcourir les twins un résumé à la fois (sans liste intermédiaire)"""
+        for t in self.twins.values():
+            yield TwinSummary(
+                twin_id=t["twin_id"],
+                version=t["twin_version"],
+                risks=len(t.get("risks", ())),
+                zones=len(t.get("zones", ()))
+            )
     
-    def list_twins(self) -> List[Dict]:
+    def list_twins(self) -> List[TwinSummary]:
         """Lister tous les twins"""
-        return [
-            {
-                "twin_id": t["twin_id"],
-                "version": t["twin_version"],
-                "risks": len(t.get("risks", [])),
-                "zones": len(t.get("zones", []))
-            }
-            for t in self.twins.values()
-        ]
+        return list(self.iter_twins())
 
 
 # =============================================================================
 # POINT D'ENTRÉE
 # =============================================================================
 
-async def main():
-    """Point d'entrée principal"""
-    print("""
+# Bannière de démarrage (masquée avec SAFETWIN_QUIET=1, p. ex. en CI)
+_BANNER = """
     ╔══════════════════════════════════════════════════════════════╗
     ║                                                              ║
     ║   🏗️  SAFETWIN X5 - DIGITAL TWIN AGENTIQUE                   ║
@@ -1025,22 +1365,31 @@ async def main():
     ║   Conformité: Vision Zero | LMRSST | ISO 45001              ║
     ║                                                              ║
     ╚══════════════════════════════════════════════════════════════╝
-    """)
+    """
+
+
+async def main():
+    """Point d'entrée principal"""
+    if os.getenv("SAFETWIN_QUIET") != "1":
+        print(_BANNER)
     
     hub = SafeTwinDigitalTwinHub()
     
-    # Démo 1: Ingestion depuis SGSST
-    print("\n📥 DÉMO 1: Ingestion depuis sources SGSST\n")
-    result1 = await hub.ingest_from_sgsst()
-    
-    print(f"\n✅ Twin créé: {result1['twin_id']}")
-    print(f"   Risques: {len(result1['risks'])}")
-    print(f"   Zones: {len(result1['zones'])}")
-    print(f"   Playbooks: {len(result1['playbooks_generated'])}")
-    
-    # Démo 2: Ingestion depuis document
-    print("\n\n📄 DÉMO 2: Ingestion depuis document PDF\n")
-    result2 = await hub.ingest_document("/docs/Programme_Prevention_2026.pdf")
+    try:
+        # Démo 1: Ingestion depuis SGSST
+        print("\n📥 DÉMO 1: Ingestion depuis sources SGSST\n")
+        result1 = await hub.ingest_from_sgsst()
+        
+        print(f"\n✅ Twin créé: {result1['twin_id']}")
+        print(f"   Risques: {len(result1['risks'])}")
+        print(f"   Zones: {len(result1['zones'])}")
+        print(f"   Playbooks: {len(result1['playbooks_generated'])}")
+        
+        # Démo 2: Ingestion depuis document
+        print("\n\n📄 DÉMO 2: Ingestion depuis document PDF\n")
+        result2 = await hub.ingest_document("/docs/Programme_Prevention_2026.pdf")
+    finally:
+        await hub.aclose()
     
     print(f"\n✅ Twin créé: {result2['twin_id']}")
     print(f"   Risques extraits: {len(result2['risks'])}")
@@ -1059,4 +1408,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Boucle uvloop (libuv) si disponible, sinon boucle asyncio standard
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
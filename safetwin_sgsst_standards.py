@@ -35,15 +35,26 @@ Conformité: ISO 45001, ISO 14001, CNESST/LSST, Vision Zero
 """
 
 import os
-import json
+import re
+import sys
 import uuid
+import asyncio
 from datetime import datetime
-from typing import Dict, List, Any, Optional, TypedDict, Protocol
+from typing import AsyncIterator, Callable, ClassVar, cast, Dict, List, Any, Iterable, Iterator, Mapping, Optional, Tuple, TypedDict, Protocol
 from dataclasses import dataclass, field
+from types import MappingProxyType
+from weakref import WeakValueDictionary
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from functools import lru_cache, reduce
+from operator import or_
 from enum import Enum
 from abc import ABC, abstractmethod
 import logging
 
+import numpy as np
+import orjson
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 logger = logging.getLogger("SafeTwinIngestion")
 
@@ -72,38 +83,67 @@ class SSEDimension(Enum):
     CONTINUOUS_IMPROVEMENT = "continuous_improvement"
 
 
+# Valeur → dimension en accès dict direct (sans passer par SSEDimension(valeur))
+_VALUE_TO_DIM: Mapping[str, SSEDimension] = MappingProxyType({d.value: d for d in SSEDimension})
+
+# Un bit par dimension (15 dimensions: un masque tient sur 16 bits)
+_DIM_BIT: Mapping[SSEDimension, int] = MappingProxyType({d: 1 << i for i, d in enumerate(SSEDimension)})
+
+
+def _dimension_mask(dimensions: Iterable[SSEDimension]) -> int:
+    """Masque de bits d'un ensemble de dimensions (intersection = un seul &)"""
+    return reduce(or_, (_DIM_BIT[d] for d in dimensions), 0)
+
+
 # =============================================================================
 # SECTION 2: SCHÉMAS DE DONNÉES STANDARDISÉS PAR DIMENSION
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StandardSchema:
     """Schéma de données standardisé pour une dimension SSE/HSE"""
     dimension: SSEDimension
-    required_fields: List[str]
-    optional_fields: List[str]
-    relationships: List[str]
-    neo4j_labels: List[str]
+    required_fields: Tuple[str, ...]   # ordre d'itération (listes acceptées, figées en tuples)
+    optional_fields: Tuple[str, ...]
+    relationships: Tuple[str, ...]
+    neo4j_labels: Tuple[str, ...]
     cnesst_mapping: Optional[str] = None
     iso_clause: Optional[str] = None
+    # Ensembles dérivés pour les tests d'appartenance O(1)
+    _required_set: frozenset = field(init=False, repr=False, compare=False)
+    _optional_set: frozenset = field(init=False, repr=False, compare=False)
+    # Relations analysées une fois: (type, label cible, champ de référence "<cible>_id")
+    relationships_parsed: Tuple[Tuple[str, str, str], ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "required_fields", tuple(self.required_fields))
+        object.__setattr__(self, "optional_fields", tuple(self.optional_fields))
+        object.__setattr__(self, "relationships", tuple(self.relationships))
+        object.__setattr__(self, "neo4j_labels", tuple(self.neo4j_labels))
+        object.__setattr__(self, "_required_set", frozenset(self.required_fields))
+        object.__setattr__(self, "_optional_set", frozenset(self.optional_fields))
+        object.__setattr__(self, "relationships_parsed", tuple(
+            (rel_type, target_label, target_label.lower() + "_id")
+            for rel_type, target_label in (rel_def.split(":") for rel_def in self.relationships)
+        ))
 
 
 # Définition des schémas pour chaque dimension
-DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
+DIMENSION_SCHEMAS: Mapping[SSEDimension, StandardSchema] = MappingProxyType({
     
     # 1. Gouvernance & Politique
     SSEDimension.GOVERNANCE_POLICY: StandardSchema(
         dimension=SSEDimension.GOVERNANCE_POLICY,
-        required_fields=[
+        required_fields=(
             "policy_id", "title", "version", "effective_date", 
             "approved_by", "scope", "objectives"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "review_date", "document_url", "responsibilities", 
             "committee_members", "meeting_frequency"
-        ],
-        relationships=["APPLIES_TO:Zone", "OWNED_BY:Organization", "REVIEWED_BY:Person"],
-        neo4j_labels=["Policy", "Governance", "Committee"],
+        ),
+        relationships=("APPLIES_TO:Zone", "OWNED_BY:Organization", "REVIEWED_BY:Person"),
+        neo4j_labels=("Policy", "Governance", "Committee"),
         iso_clause="ISO 45001:5.1-5.4",
         cnesst_mapping="Programme de prévention"
     ),
@@ -111,19 +151,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 2. Risques & Opportunités
     SSEDimension.RISKS_OPPORTUNITIES: StandardSchema(
         dimension=SSEDimension.RISKS_OPPORTUNITIES,
-        required_fields=[
+        required_fields=(
             "risk_id", "title", "category", "severity", "probability",
             "risk_score", "status", "identified_date"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "location", "coordinates", "affected_workers",
             "control_measures", "residual_risk", "review_date", "owner"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "LOCATED_IN:Zone", "AFFECTS:Equipment", "MITIGATED_BY:ControlMeasure",
             "IDENTIFIED_BY:Person", "LINKED_TO:Incident"
-        ],
-        neo4j_labels=["Risk", "Hazard", "Opportunity"],
+        ),
+        neo4j_labels=("Risk", "Hazard", "Opportunity"),
         iso_clause="ISO 45001:6.1",
         cnesst_mapping="RC1-RC8 Catégories CNESST"
     ),
@@ -131,19 +171,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 3. Conformité & Exigences
     SSEDimension.COMPLIANCE_REQUIREMENTS: StandardSchema(
         dimension=SSEDimension.COMPLIANCE_REQUIREMENTS,
-        required_fields=[
+        required_fields=(
             "requirement_id", "title", "type", "source", 
             "jurisdiction", "effective_date", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "deadline", "responsible_party", 
             "evidence_required", "last_evaluation", "next_evaluation"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "APPLIES_TO:Organization", "EVALUATED_BY:Audit",
             "DOCUMENTED_IN:Document", "ENFORCED_BY:Authority"
-        ],
-        neo4j_labels=["Requirement", "Regulation", "Standard", "Obligation"],
+        ),
+        neo4j_labels=("Requirement", "Regulation", "Standard", "Obligation"),
         iso_clause="ISO 45001:6.1.3",
         cnesst_mapping="LSST, RSST, CNESST"
     ),
@@ -151,19 +191,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 4. Santé & Sécurité au Travail
     SSEDimension.OCCUPATIONAL_HEALTH_SAFETY: StandardSchema(
         dimension=SSEDimension.OCCUPATIONAL_HEALTH_SAFETY,
-        required_fields=[
+        required_fields=(
             "record_id", "type", "worker_id", "date", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "body_part", "injury_type", "days_lost",
             "treatment", "restrictions", "return_to_work_date",
             "exposure_type", "exposure_level", "medical_surveillance"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "INVOLVES:Worker", "OCCURRED_AT:Zone", "CAUSED_BY:Risk",
             "TREATED_BY:MedicalProvider", "REPORTED_TO:Authority"
-        ],
-        neo4j_labels=["HealthRecord", "Injury", "Exposure", "Ergonomic"],
+        ),
+        neo4j_labels=("HealthRecord", "Injury", "Exposure", "Ergonomic"),
         iso_clause="ISO 45001:8.1.2",
         cnesst_mapping="Lésions professionnelles, AT/MP"
     ),
@@ -171,18 +211,18 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 5. Environnement
     SSEDimension.ENVIRONMENT: StandardSchema(
         dimension=SSEDimension.ENVIRONMENT,
-        required_fields=[
+        required_fields=(
             "aspect_id", "type", "impact_type", "significance", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "location", "measurement_value", "unit",
             "threshold", "monitoring_frequency", "mitigation_measures"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "LOCATED_AT:Zone", "MONITORED_BY:Equipment",
             "REGULATED_BY:Requirement", "REPORTED_IN:Report"
-        ],
-        neo4j_labels=["EnvironmentalAspect", "Emission", "Waste", "Energy"],
+        ),
+        neo4j_labels=("EnvironmentalAspect", "Emission", "Waste", "Energy"),
         iso_clause="ISO 14001:6.1.2",
         cnesst_mapping="Aspects environnementaux"
     ),
@@ -190,19 +230,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 6. Produits Chimiques / Dangereux
     SSEDimension.HAZARDOUS_MATERIALS: StandardSchema(
         dimension=SSEDimension.HAZARDOUS_MATERIALS,
-        required_fields=[
+        required_fields=(
             "material_id", "name", "cas_number", "hazard_class",
             "quantity", "location", "sds_available"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "supplier", "sds_date", "storage_requirements", "ppe_required",
             "exposure_limits", "first_aid", "spill_procedure"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "STORED_IN:Zone", "USED_BY:Process", "REQUIRES:PPE",
             "DOCUMENTED_IN:SDS", "REGULATED_BY:Requirement"
-        ],
-        neo4j_labels=["HazardousMaterial", "Chemical", "SDS"],
+        ),
+        neo4j_labels=("HazardousMaterial", "Chemical", "SDS"),
         iso_clause="ISO 45001:8.1.2",
         cnesst_mapping="SIMDUT, SGH"
     ),
@@ -210,18 +250,18 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 7. Opérations & Contrôles
     SSEDimension.OPERATIONS_CONTROLS: StandardSchema(
         dimension=SSEDimension.OPERATIONS_CONTROLS,
-        required_fields=[
+        required_fields=(
             "control_id", "type", "title", "status", "effective_date"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "procedure_url", "responsible", "frequency",
             "verification_method", "deviation_handling"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "APPLIES_TO:Process", "DOCUMENTED_IN:Procedure",
             "VERIFIED_BY:Inspection", "MITIGATES:Risk"
-        ],
-        neo4j_labels=["Control", "Procedure", "Permit", "LOTO"],
+        ),
+        neo4j_labels=("Control", "Procedure", "Permit", "LOTO"),
         iso_clause="ISO 45001:8.1",
         cnesst_mapping="Procédures de travail sécuritaire"
     ),
@@ -229,20 +269,20 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 8. Incidents & Non-Conformités
     SSEDimension.INCIDENTS_NONCONFORMITIES: StandardSchema(
         dimension=SSEDimension.INCIDENTS_NONCONFORMITIES,
-        required_fields=[
+        required_fields=(
             "incident_id", "type", "date", "time", "location",
             "severity", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "immediate_cause", "root_cause", "witnesses",
             "injuries", "damages", "corrective_actions", "preventive_actions",
             "investigation_date", "closure_date", "lessons_learned"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "OCCURRED_AT:Zone", "INVOLVED:Worker", "CAUSED_BY:Risk",
             "INVESTIGATED_BY:Person", "RESULTED_IN:Action"
-        ],
-        neo4j_labels=["Incident", "NearMiss", "NonConformity", "Accident"],
+        ),
+        neo4j_labels=("Incident", "NearMiss", "NonConformity", "Accident"),
         iso_clause="ISO 45001:10.2",
         cnesst_mapping="Déclaration CNESST, ADR"
     ),
@@ -250,20 +290,20 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 9. Changements & Projets
     SSEDimension.CHANGE_MANAGEMENT: StandardSchema(
         dimension=SSEDimension.CHANGE_MANAGEMENT,
-        required_fields=[
+        required_fields=(
             "change_id", "title", "type", "status", "requested_date",
             "requestor"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "justification", "risk_assessment",
             "affected_areas", "implementation_date", "approval_status",
             "approvers", "rollback_plan"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "AFFECTS:Zone", "ASSESSED_FOR:Risk", "APPROVED_BY:Person",
             "DOCUMENTED_IN:Document", "TRIGGERS:Action"
-        ],
-        neo4j_labels=["Change", "MOC", "Project"],
+        ),
+        neo4j_labels=("Change", "MOC", "Project"),
         iso_clause="ISO 45001:8.1.3",
         cnesst_mapping="Gestion des changements"
     ),
@@ -271,18 +311,18 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 10. Compétences & Culture
     SSEDimension.COMPETENCIES_CULTURE: StandardSchema(
         dimension=SSEDimension.COMPETENCIES_CULTURE,
-        required_fields=[
+        required_fields=(
             "training_id", "title", "type", "status", "target_audience"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "duration", "provider", "certification",
             "validity_period", "completion_date", "score", "refresher_date"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "COMPLETED_BY:Worker", "REQUIRED_FOR:Job", "COVERS:Risk",
             "PROVIDED_BY:Trainer", "DOCUMENTED_IN:Certificate"
-        ],
-        neo4j_labels=["Training", "Competency", "Certification", "Awareness"],
+        ),
+        neo4j_labels=("Training", "Competency", "Certification", "Awareness"),
         iso_clause="ISO 45001:7.2-7.3",
         cnesst_mapping="Formation SST obligatoire"
     ),
@@ -290,18 +330,18 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 11. Communication & Participation
     SSEDimension.COMMUNICATION_PARTICIPATION: StandardSchema(
         dimension=SSEDimension.COMMUNICATION_PARTICIPATION,
-        required_fields=[
+        required_fields=(
             "communication_id", "type", "date", "participants", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "subject", "summary", "decisions", "action_items",
             "next_meeting", "attachments"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "ATTENDED_BY:Person", "DISCUSSED:Risk", "RESULTED_IN:Action",
             "DOCUMENTED_IN:Minutes", "RELATED_TO:Incident"
-        ],
-        neo4j_labels=["Meeting", "Communication", "Consultation", "Observation"],
+        ),
+        neo4j_labels=("Meeting", "Communication", "Consultation", "Observation"),
         iso_clause="ISO 45001:7.4",
         cnesst_mapping="CSS, Comité SST"
     ),
@@ -309,19 +349,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 12. Urgences & Crise
     SSEDimension.EMERGENCY_CRISIS: StandardSchema(
         dimension=SSEDimension.EMERGENCY_CRISIS,
-        required_fields=[
+        required_fields=(
             "plan_id", "title", "type", "version", "effective_date", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "scope", "responsibilities", "resources",
             "evacuation_routes", "assembly_points", "communication_tree",
             "drill_frequency", "last_drill_date", "next_drill_date"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "APPLIES_TO:Zone", "INVOLVES:Equipment", "COORDINATED_BY:Person",
             "TESTED_BY:Drill", "DOCUMENTED_IN:Procedure"
-        ],
-        neo4j_labels=["EmergencyPlan", "Drill", "Crisis", "Evacuation"],
+        ),
+        neo4j_labels=("EmergencyPlan", "Drill", "Crisis", "Evacuation"),
         iso_clause="ISO 45001:8.2",
         cnesst_mapping="Plan d'urgence, Évacuation"
     ),
@@ -329,19 +369,19 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 13. Audits, Inspections & Revue
     SSEDimension.AUDITS_INSPECTIONS: StandardSchema(
         dimension=SSEDimension.AUDITS_INSPECTIONS,
-        required_fields=[
+        required_fields=(
             "audit_id", "type", "date", "auditor", "scope", "status"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "checklist_used", "findings", "score", "non_conformities",
             "observations", "recommendations", "follow_up_date",
             "closure_date", "report_url"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "AUDITED:Zone", "CONDUCTED_BY:Auditor", "FOUND:NonConformity",
             "DOCUMENTED_IN:Report", "RESULTED_IN:Action"
-        ],
-        neo4j_labels=["Audit", "Inspection", "Review", "Assessment"],
+        ),
+        neo4j_labels=("Audit", "Inspection", "Review", "Assessment"),
         iso_clause="ISO 45001:9.2-9.3",
         cnesst_mapping="Audit interne, Inspection CNESST"
     ),
@@ -349,18 +389,18 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 14. Indicateurs & Reporting
     SSEDimension.INDICATORS_REPORTING: StandardSchema(
         dimension=SSEDimension.INDICATORS_REPORTING,
-        required_fields=[
+        required_fields=(
             "kpi_id", "name", "type", "value", "unit", "period", "target"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "formula", "data_source", "frequency",
             "trend", "benchmark", "responsible", "dashboard_url"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "MEASURES:Process", "REPORTED_TO:Stakeholder",
             "COMPARED_TO:Benchmark", "VISUALIZED_IN:Dashboard"
-        ],
-        neo4j_labels=["KPI", "Metric", "Report", "Dashboard"],
+        ),
+        neo4j_labels=("KPI", "Metric", "Report", "Dashboard"),
         iso_clause="ISO 45001:9.1",
         cnesst_mapping="TRIR, LTIFR, Fréquence/Gravité"
     ),
@@ -368,23 +408,23 @@ DIMENSION_SCHEMAS: Dict[SSEDimension, StandardSchema] = {
     # 15. Amélioration Continue
     SSEDimension.CONTINUOUS_IMPROVEMENT: StandardSchema(
         dimension=SSEDimension.CONTINUOUS_IMPROVEMENT,
-        required_fields=[
+        required_fields=(
             "action_id", "type", "title", "status", "created_date", "owner"
-        ],
-        optional_fields=[
+        ),
+        optional_fields=(
             "description", "source", "priority", "target_date",
             "completion_date", "effectiveness", "lessons_learned",
             "related_incidents", "cost_savings"
-        ],
-        relationships=[
+        ),
+        relationships=(
             "ADDRESSES:Risk", "ASSIGNED_TO:Person", "ORIGINATED_FROM:Incident",
             "DOCUMENTED_IN:Report", "VERIFIED_BY:Audit"
-        ],
-        neo4j_labels=["Action", "CAPA", "Improvement", "LessonLearned"],
+        ),
+        neo4j_labels=("Action", "CAPA", "Improvement", "LessonLearned"),
         iso_clause="ISO 45001:10.3",
         cnesst_mapping="Actions correctives/préventives"
     ),
-}
+})
 
 
 # =============================================================================
@@ -407,12 +447,22 @@ class SGSSTAdapter(Protocol):
         """Liste des dimensions SSE/HSE supportées par cette plateforme"""
         ...
     
+    @property
+    def supported_dimensions_set(self) -> frozenset:
+        """Mêmes dimensions, en frozenset pour les tests d'appartenance"""
+        ...
+    
+    @property
+    def dimension_mask(self) -> int:
+        """Mêmes dimensions, en masque de bits (voir _DIM_BIT)"""
+        ...
+    
     def connect(self, credentials: Dict[str, str]) -> bool:
         """Établir la connexion à la plateforme"""
         ...
     
-    def fetch_data(self, dimension: SSEDimension, filters: Dict = None) -> List[Dict]:
-        """Récupérer les données brutes pour une dimension"""
+    async def fetch_data(self, dimension: SSEDimension, filters: Optional[Dict] = None) -> List[Dict]:
+        """Récupérer les données brutes pour une dimension (E/S asynchrones)"""
         ...
     
     def transform_to_standard(self, dimension: SSEDimension, raw_data: List[Dict]) -> List[Dict]:
@@ -424,27 +474,96 @@ class SGSSTAdapter(Protocol):
 # SECTION 4: ADAPTATEUR GÉNÉRIQUE (TEMPLATE)
 # =============================================================================
 
+# Champs catégoriels très répétés d'un enregistrement à l'autre (CAS, classes
+# SIMDUT, fournisseurs...): valeurs internées pour n'en garder qu'une copie
+_INTERN_FIELDS = frozenset({
+    "cas_number", "hazard_class", "supplier", "category", "type",
+    "severity", "status", "source_platform", "dimension"
+})
+
+
+def _uuid_batch(n: int) -> List[str]:
+    """n identifiants UUID4 tirés d'un seul appel os.urandom"""
+    buf = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+
+def _iter_uuids(chunk: int = 256):
+    """Flux paresseux d'identifiants UUID4, tirés par lots de `chunk`"""
+    while True:
+        yield from _uuid_batch(chunk)
+
+
 class GenericSGSSTAdapter(ABC):
     """
     Classe de base pour créer un adaptateur SGSST.
     Héritez de cette classe pour intégrer une nouvelle plateforme.
     """
     
+    __slots__ = (
+        "_platform_name", "base_url", "auth_type", "connected",
+        "credentials", "_supported_dimensions_list", "_supported_dimensions_set",
+        "_dimension_mask", "_field_mappings_compiled", "_reverse_mapping"
+    )
+    
+    # Au-delà de ce nombre d'enregistrements, transformation en colonnes (pandas)
+    COLUMNAR_THRESHOLD = 10_000
+    
     def __init__(self, platform_name: str, base_url: str, auth_type: str):
         self._platform_name = platform_name
         self.base_url = base_url
         self.auth_type = auth_type
         self.connected = False
         self.credentials = {}
-        self._supported_dimensions: List[SSEDimension] = []
+        self._supported_dimensions = []
+        # Mapping déclaratif champ standard → champs plateforme candidats (par priorité)
+        self._field_mappings = {}
     
     @property
     def platform_name(self) -> str:
         return self._platform_name
     
+    @property
+    def _field_mappings(self) -> Dict[str, Tuple[str, ...]]:
+        return self._field_mappings_compiled
+    
+    @_field_mappings.setter
+    def _field_mappings(self, mappings: Dict[str, List[str]]) -> None:
+        # Candidats figés en tuples à l'assignation (parcours plus rapide)
+        self._field_mappings_compiled = {
+            standard_field: tuple(candidates) for standard_field, candidates in mappings.items()
+        }
+        # Index inverse champ plateforme → ((champ standard, rang du candidat), ...)
+        reverse = defaultdict(list)
+        for standard_field, candidates in self._field_mappings_compiled.items():
+            for rank, source_field in enumerate(candidates):
+                reverse[source_field].append((standard_field, rank))
+        self._reverse_mapping = {source_field: tuple(targets) for source_field, targets in reverse.items()}
+    
+    @property
+    def _supported_dimensions(self) -> List[SSEDimension]:
+        return self._supported_dimensions_list
+    
+    @_supported_dimensions.setter
+    def _supported_dimensions(self, dimensions: List[SSEDimension]) -> None:
+        # Les sous-classes assignent la liste: l'ensemble d'appartenance suit
+        self._supported_dimensions_list = dimensions
+        self._supported_dimensions_set = frozenset(dimensions)
+        self._dimension_mask = _dimension_mask(dimensions)
+    
     @property
     def supported_dimensions(self) -> List[SSEDimension]:
-        return self._supported_dimensions
+        return self._supported_dimensions_list
+    
+    @property
+    def supported_dimensions_set(self) -> frozenset:
+        """Dimensions supportées, pour les tests d'appartenance en O(1)"""
+        return self._supported_dimensions_set
+    
+    @property
+    def dimension_mask(self) -> int:
+        """Dimensions supportées en masque de bits, pour filtrer les plateformes d'un seul &"""
+        return self._dimension_mask
     
     @abstractmethod
     def connect(self, credentials: Dict[str, str]) -> bool:
@@ -452,8 +571,8 @@ class GenericSGSSTAdapter(ABC):
         pass
     
     @abstractmethod
-    def fetch_data(self, dimension: SSEDimension, filters: Dict = None) -> List[Dict]:
-        """À implémenter: logique de récupération spécifique"""
+    async def fetch_data(self, dimension: SSEDimension, filters: Optional[Dict] = None) -> List[Dict]:
+        """À implémenter: logique de récupération spécifique (coroutine)"""
         pass
     
     def transform_to_standard(self, dimension: SSEDimension, raw_data: List[Dict]) -> List[Dict]:
@@ -465,53 +584,233 @@ class GenericSGSSTAdapter(ABC):
         if not schema:
             raise ValueError(f"Dimension inconnue: {dimension}")
         
+        # Invariants du lot: même horodatage d'import pour tous les enregistrements
+        imported_at = datetime.now().isoformat()
+        platform = sys.intern(self.platform_name)
+        dim_value = dimension.value
+        required = schema.required_fields
+        optional = schema.optional_fields
+        map_field = self._map_field
+        reverse = self._reverse_mapping
+        intern = sys.intern
+        # Mapping purement déclaratif (_map_field non surchargé): résolu par
+        # l'index inverse, en une passe sur les clés de chaque enregistrement
+        declarative = type(self)._map_field is GenericSGSSTAdapter._map_field
+        
+        # Gros lots: résolution colonne par colonne
+        if declarative and len(raw_data) >= self.COLUMNAR_THRESHOLD:
+            return self._transform_columnar(raw_data, required, optional, {
+                "source_platform": platform,
+                "dimension": dim_value,
+                "imported_at": imported_at
+            })
+        
+        # Identifiants des enregistrements sans id: un seul tirage aléatoire
+        new_ids = iter(_uuid_batch(sum(1 for record in raw_data if not record.get("id"))))
+        
         standardized = []
         for record in raw_data:
+            data: Dict[str, Any] = {}
+            mapped: Dict[str, Any] = {}
             std_record = {
-                "id": record.get("id") or str(uuid.uuid4()),
-                "source_platform": self.platform_name,
-                "dimension": dimension.value,
-                "imported_at": datetime.now().isoformat(),
-                "data": {}
+                "id": record.get("id") or next(new_ids),
+                "source_platform": platform,
+                "dimension": dim_value,
+                "imported_at": imported_at,
+                "data": data
             }
             
+            if declarative:
+                # Premier candidat présent (plus petit rang) par champ standard
+                ranks: Dict[str, int] = {}
+                for source_field, value in record.items():
+                    for field, rank in reverse.get(source_field, ()):
+                        if rank < ranks.get(field, rank + 1):
+                            ranks[field] = rank
+                            mapped[field] = value
+            
             # Mapper les champs requis
-            for field in schema.required_fields:
-                std_record["data"][field] = record.get(field) or self._map_field(field, record)
+            # (valeur directe si non None, sinon mapping: 0 et "" sont conservés)
+            for field in required:
+                value = record.get(field)
+                if value is None:
+                    value = mapped.get(field) if declarative else map_field(field, record)
+                if field in _INTERN_FIELDS and type(value) is str:
+                    value = intern(value)
+                data[field] = value
             
-            # Mapper les champs optionnels présents
-            for field in schema.optional_fields:
-                if field in record or self._has_mapped_field(field, record):
-                    std_record["data"][field] = record.get(field) or self._map_field(field, record)
+            # Mapper les champs optionnels présents (résolus en une seule passe)
+            for field in optional:
+                value = record.get(field)
+                if value is None:
+                    value = mapped.get(field) if declarative else map_field(field, record)
+                if value is not None:
+                    if field in _INTERN_FIELDS and type(value) is str:
+                        value = intern(value)
+                    data[field] = value
             
             standardized.append(std_record)
         
         return standardized
     
+    def _transform_columnar(
+        self,
+        raw_data: List[Dict],
+        required: tuple,
+        optional: tuple,
+        meta: Dict[str, str]
+    ) -> List[Dict]:
+        """
+        Variante en colonnes (pandas) de transform_to_standard pour les gros lots.
+        
+        Même règle que la boucle par enregistrement: valeur directe si elle
+        n'est pas None, sinon premier champ candidat non nul de _field_mappings.
+        """
+        import pandas as pd  # import différé: seulement pour les gros lots
+        
+        df = pd.DataFrame(raw_data, dtype=object)
+        df = df.where(df.notna(), None)
+        columns = df.columns
+        
+        def resolve(field: str) -> Optional["pd.Series"]:
+            """Colonne résolue d'un champ standard (None si aucune source)"""
+            mapped = None
+            for source in self._field_mappings.get(field, ()):
+                if source in columns:
+                    mapped = df[source] if mapped is None else mapped.where(mapped.notna(), df[source])
+            if field not in columns:
+                return mapped
+            direct = df[field]
+            return direct.where(direct.notna(), mapped)
+        
+        # Champs requis: toujours présents (None à défaut de source). Les lignes
+        # sont assemblées par zip des colonnes (plus rapide que to_dict("records"))
+        n_rows = len(df)
+        required_values = []
+        for field in required:
+            column = resolve(field)
+            if column is None:
+                required_values.append([None] * n_rows)
+            else:
+                values = column.astype(object).where(column.notna(), None).tolist()
+                if field in _INTERN_FIELDS:
+                    values = [sys.intern(v) if type(v) is str else v for v in values]
+                required_values.append(values)
+        data_rows = [dict(zip(required, values)) for values in zip(*required_values)]
+        
+        # Champs optionnels: ajoutés seulement là où une valeur existe
+        for field in optional:
+            column = resolve(field)
+            if column is not None:
+                interned = field in _INTERN_FIELDS
+                for i, value in column[column.notna()].items():
+                    data_rows[i][field] = sys.intern(value) if interned and type(value) is str else value
+        
+        # Identifiants: id d'origine s'il est vrai, sinon UUID tiré en un seul lot
+        ids = df["id"].copy() if "id" in columns else pd.Series(None, index=df.index, dtype=object)
+        missing = ~ids.map(bool)
+        ids[missing] = _uuid_batch(int(missing.sum()))
+        
+        return [{"id": record_id, **meta, "data": data} for record_id, data in zip(ids, data_rows)]
+    
     def _map_field(self, standard_field: str, record: Dict) -> Any:
         """
-        À surcharger: mapping des noms de champs plateforme → standard.
-        Par défaut, retourne None.
+        Mapping des noms de champs plateforme → standard.
+        Par défaut, premier champ candidat de self._field_mappings présent
+        dans l'enregistrement (None sinon). Peut être surchargé.
         """
+        for field in self._field_mappings.get(standard_field, ()):
+            if field in record:
+                return record[field]
         return None
-    
-    def _has_mapped_field(self, standard_field: str, record: Dict) -> bool:
-        """Vérifie si un champ mappé existe"""
-        return self._map_field(standard_field, record) is not None
 
 
 # =============================================================================
 # SECTION 5: NORMALIZER VERS SAFETYGRAPH
 # =============================================================================
 
+# Gabarits Cypher compilés par dimension (construits à la première utilisation).
+# Requêtes UNWIND: un seul appel par lot, seuls les paramètres varient.
+_COMPILED_TEMPLATES: Dict[SSEDimension, Dict[str, Any]] = {}
+
+
+def _compile_templates(dimension: SSEDimension) -> Dict[str, Any]:
+    """Compile (une fois) les requêtes nœud et relations d'une dimension"""
+    templates = _COMPILED_TEMPLATES.get(dimension)
+    if templates is None:
+        schema = DIMENSION_SCHEMAS[dimension]
+        primary_label = schema.neo4j_labels[0] if schema.neo4j_labels else "Entity"
+        labels_str = ":".join(schema.neo4j_labels)
+        
+        relationships = []
+        for rel_type, target_label, target_field in schema.relationships_parsed:
+            relationships.append((
+                rel_type,
+                target_label,
+                target_field,
+                f"UNWIND $rels AS r "
+                f"MATCH (a:{primary_label} {{id: r.from_id}}), (b:{target_label} {{id: r.to_id}}) "
+                f"MERGE (a)-[x:{rel_type}]->(b)"
+            ))
+        
+        templates = _COMPILED_TEMPLATES[dimension] = {
+            "primary_label": primary_label,
+            "node_query": f"UNWIND $batch AS row MERGE (n:{labels_str} {{id: row.id}}) SET n += row.props",
+            "relationships": relationships,
+            # Propriétés constantes de la dimension, fusionnées telles quelles dans chaque nœud
+            "static_props": {
+                "dimension": dimension.value,
+                "cnesst_mapping": schema.cnesst_mapping,
+                "iso_clause": schema.iso_clause
+            }
+        }
+    return templates
+
+
+# Options orjson des exports (datetimes naïfs considérés UTC, tableaux numpy natifs)
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+# Variante APOC: texte de requête unique pour toutes les dimensions (labels
+# passés en paramètre), donc un seul plan mis en cache côté serveur
+_APOC_NODE_QUERY = (
+    "UNWIND $batch AS row "
+    "CALL apoc.merge.node(row.labels, {id: row.id}, row.props, row.props) YIELD node "
+    "RETURN count(node)"
+)
+
+
+# Métadonnées par valeur de dimension, précalculées à l'import:
+# (dimension, schéma, champ identifiant, gabarits compilés)
+_SCHEMA_META: Dict[str, Tuple[SSEDimension, StandardSchema, Optional[str], Dict[str, Any]]] = {
+    dim.value: (
+        dim,
+        schema,
+        schema.required_fields[0] if schema.required_fields else None,
+        _compile_templates(dim)
+    )
+    for dim, schema in DIMENSION_SCHEMAS.items()
+}
+
+
 class SafetyGraphNormalizer:
     """
     Normalise les données standardisées vers l'ontologie SafetyGraph Neo4j.
     Génère les requêtes Cypher pour ingestion dans le Knowledge Graph.
     """
     
+    __slots__ = ("cypher_queries", "nodes_created", "relationships_created", "use_apoc")
+    
+    # Attributs typés strictement (boucle de normalize compilable par mypyc)
+    cypher_queries: List[Dict[str, Any]]
+    nodes_created: int
+    relationships_created: int
+    use_apoc: bool
+    
+    # Lignes maximum par requête UNWIND (taille de transaction recommandée Neo4j)
+    MAX_BATCH_ROWS: ClassVar[int] = 10_000
+    
     # Mapping catégories CNESST
-    CNESST_RISK_CATEGORIES = {
+    CNESST_RISK_CATEGORIES: ClassVar[Dict[str, str]] = {
         "fall_height": "RC1_CHUTES_HAUTEUR",
         "burial": "RC2_ENSEVELISSEMENT",
         "machine": "RC3_MACHINES",
@@ -522,14 +821,24 @@ class SafetyGraphNormalizer:
         "ergonomic": "RC8_ERGONOMIE_TMS",
     }
     
-    def __init__(self):
+    # Alternation ancrée : chaque branche « .*?clé » est essayée dans l'ordre
+    # du dict, ce qui conserve la priorité de l'ancienne boucle
+    _CNESST_PATTERN: ClassVar["re.Pattern[str]"] = re.compile(
+        "|".join(f".*?(?P<{key}>{re.escape(key)})" for key in CNESST_RISK_CATEGORIES),
+        re.IGNORECASE | re.DOTALL,
+    )
+    
+    def __init__(self, use_apoc: Optional[bool] = None) -> None:
         self.cypher_queries = []
         self.nodes_created = 0
         self.relationships_created = 0
+        # Nœuds via apoc.merge.node (NEO4J_APOC=1); sinon une requête statique par dimension
+        self.use_apoc = os.getenv("NEO4J_APOC", "0") == "1" if use_apoc is None else use_apoc
     
-    def normalize(self, standardized_data: List[Dict]) -> Dict[str, Any]:
+    def normalize(self, standardized_data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Normalise les données standardisées vers SafetyGraph.
+        Parcourt l'entrée une seule fois (liste ou flux d'enregistrements).
         
         Returns:
             Dict avec cypher_queries, nodes, relationships, summary
@@ -538,66 +847,94 @@ class SafetyGraphNormalizer:
         self.nodes_created = 0
         self.relationships_created = 0
         
-        nodes = []
-        relationships = []
+        nodes: List[Dict[str, Any]] = []
+        relationships: List[Dict[str, Any]] = []
+        # Identifiants de secours (schéma sans champ requis), tirés par lots à la demande
+        next_uuid: Callable[[], str] = _iter_uuids().__next__
+        # Lots de paramètres par requête compilée (nœuds, puis relations)
+        node_batches: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        rel_batches: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         
+        # Partitionner une seule fois par dimension, puis traiter chaque
+        # partition avec les invariants de son schéma sortis de la boucle
+        buckets: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
         for record in standardized_data:
-            dimension = SSEDimension(record.get("dimension"))
-            schema = DIMENSION_SCHEMAS.get(dimension)
-            data = record.get("data", {})
-            
-            # Créer le nœud principal
-            primary_label = schema.neo4j_labels[0] if schema.neo4j_labels else "Entity"
-            node_id = data.get(schema.required_fields[0]) if schema.required_fields else str(uuid.uuid4())
-            
-            node = {
-                "id": node_id,
-                "labels": schema.neo4j_labels,
-                "properties": {
-                    **data,
-                    "source_platform": record.get("source_platform"),
-                    "dimension": dimension.value,
-                    "imported_at": record.get("imported_at"),
-                    "cnesst_mapping": schema.cnesst_mapping,
-                    "iso_clause": schema.iso_clause
-                }
-            }
-            nodes.append(node)
-            self.nodes_created += 1
-            
-            # Générer Cypher pour le nœud
-            props_str = ", ".join([f'{k}: ${k}' for k in node["properties"].keys()])
-            labels_str = ":".join(schema.neo4j_labels)
-            cypher = f"MERGE (n:{labels_str} {{id: $id}}) SET n += {{{props_str}}}"
-            self.cypher_queries.append({
-                "query": cypher,
-                "params": {"id": node_id, **node["properties"]}
-            })
+            buckets[record.get("dimension")].append(record)
+        
+        for dim_value, records in buckets.items():
+            meta = _SCHEMA_META.get(dim_value)
+            if meta is None:
+                raise ValueError(f"Dimension inconnue: {dim_value}")
+            dimension, schema, id_field, templates = meta
+            labels: Tuple[str, ...] = schema.neo4j_labels
+            primary_label: str = templates["primary_label"]
+            static_props: Dict[str, Any] = templates["static_props"]
+            node_rows: List[Dict[str, Any]]
+            row_labels: Optional[List[str]]
+            if self.use_apoc:
+                # Requête commune: les labels voyagent avec chaque ligne
+                node_rows = node_batches[_APOC_NODE_QUERY]
+                row_labels = list(labels)
+            else:
+                node_rows = node_batches[templates["node_query"]]
+                row_labels = None
+            rel_specs: List[Tuple[str, str, str, List[Dict[str, Any]]]] = [
+                (rel_type, target_label, target_field, rel_batches[rel_query])
+                for rel_type, target_label, target_field, rel_query in templates["relationships"]
+            ]
             
-            # Extraire et créer les relations
-            for rel_def in schema.relationships:
-                rel_type, target_label = rel_def.split(":")
-                # Chercher les références dans les données
-                target_field = target_label.lower() + "_id"
-                if target_field in data and data[target_field]:
-                    rel = {
-                        "from_id": node_id,
-                        "from_label": primary_label,
-                        "type": rel_type,
-                        "to_id": data[target_field],
-                        "to_label": target_label
+            for record in records:
+                data: Dict[str, Any] = record.get("data", {})
+                
+                # Créer le nœud principal
+                node_id: Any = data.get(id_field) if id_field else next_uuid()
+                
+                node: Dict[str, Any] = {
+                    "id": node_id,
+                    "labels": labels,
+                    "properties": {
+                        **data,
+                        "source_platform": record.get("source_platform"),
+                        "imported_at": record.get("imported_at"),
+                        **static_props
                     }
-                    relationships.append(rel)
-                    self.relationships_created += 1
-                    
-                    cypher_rel = f"""
-                    MATCH (a:{primary_label} {{id: $from_id}}), (b:{target_label} {{id: $to_id}})
-                    MERGE (a)-[r:{rel_type}]->(b)
-                    """
-                    self.cypher_queries.append({
-                        "query": cypher_rel,
-                        "params": {"from_id": node_id, "to_id": data[target_field]}
-                    })
+                }
+                nodes.append(node)
+                row: Dict[str, Any] = {"id": node_id, "props": node["properties"]}
+                if row_labels is not None:
+                    row["labels"] = row_labels
+                node_rows.append(row)
+                
+                # Extraire et créer les relations
+                for rel_type, target_label, target_field, rel_rows in rel_specs:
+                    # Chercher les références dans les données
+                    target_id: Any = data.get(target_field)
+                    if target_id:
+                        relationships.append({
+                            "from_id": node_id,
+                            "from_label": primary_label,
+                            "type": rel_type,
+                            "to_id": target_id,
+                            "to_label": target_label
+                        })
+                        rel_rows.append({"from_id": node_id, "to_id": target_id})
+        
+        self.nodes_created = len(nodes)
+        self.relationships_created = len(relationships)
+        
+        # Une requête UNWIND par lot (au plus MAX_BATCH_ROWS lignes par transaction):
+        # les nœuds avant les relations qui les référencent
+        step: int = self.MAX_BATCH_ROWS
+        self.cypher_queries.extend(
+            {"query": query, "params": {"batch": rows[i:i + step]}}
+            for query, rows in node_batches.items()
+            for i in range(0, len(rows), step)
+        )
+        self.cypher_queries.extend(
+            {"query": query, "params": {"rels": rows[i:i + step]}}
+            for query, rows in rel_batches.items()
+            for i in range(0, len(rows), step)
+        )
         
         return {
             "nodes": nodes,
@@ -606,17 +943,20 @@ class SafetyGraphNormalizer:
             "summary": {
                 "nodes_created": self.nodes_created,
                 "relationships_created": self.relationships_created,
-                "dimensions_processed": len(set(r.get("dimension") for r in standardized_data))
+                "dimensions_processed": len(buckets)
             }
         }
     
+    def export_queries(self) -> bytes:
+        """Sérialiser les requêtes Cypher et leurs paramètres (orjson) pour le transport"""
+        return orjson.dumps(self.cypher_queries, option=_ORJSON_OPTIONS)
+    
     def map_to_cnesst_category(self, risk_type: str) -> str:
         """Mappe un type de risque vers la catégorie CNESST"""
-        risk_lower = risk_type.lower()
-        for key, category in self.CNESST_RISK_CATEGORIES.items():
-            if key in risk_lower:
-                return category
-        return "RC0_AUTRE"
+        match = self._CNESST_PATTERN.match(risk_type)
+        if match is None:
+            return "RC0_AUTRE"
+        return self.CNESST_RISK_CATEGORIES[cast(str, match.lastgroup)]
 
 
 # =============================================================================
@@ -654,8 +994,8 @@ class SGSSTIngestionManager:
     async def ingest_from_platform(
         self,
         platform_name: str,
-        dimensions: List[SSEDimension] = None,
-        filters: Dict = None
+        dimensions: Optional[List[SSEDimension]] = None,
+        filters: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """
         Ingère les données d'une plateforme SGSST vers SafetyGraph.
@@ -681,35 +1021,53 @@ class SGSSTIngestionManager:
         ingestion_id = f"ING-{uuid.uuid4().hex[:8]}"
         start_time = datetime.now()
         
-        all_standardized = []
-        dimension_stats = {}
-        
+        supported_set = adapter.supported_dimensions_set
+        supported = []
         for dimension in dims_to_process:
-            if dimension not in adapter.supported_dimensions:
+            if dimension not in supported_set:
                 logger.warning(f"⚠️ Dimension {dimension.value} non supportée par {platform_name}")
                 continue
+            supported.append(dimension)
+        
+        async def ingest_dimension(dimension: SSEDimension):
+            # 1. Fetch données brutes (E/S: toutes les dimensions en parallèle)
+            raw_data = await adapter.fetch_data(dimension, filters)
             
-            try:
-                # 1. Fetch données brutes
-                raw_data = adapter.fetch_data(dimension, filters)
-                
-                # 2. Transformer vers standard
-                standardized = adapter.transform_to_standard(dimension, raw_data)
-                
-                all_standardized.extend(standardized)
-                dimension_stats[dimension.value] = {
-                    "raw_count": len(raw_data),
-                    "standardized_count": len(standardized)
-                }
-                
-                logger.info(f"📥 {dimension.value}: {len(standardized)} enregistrements")
-                
-            except Exception as e:
-                logger.error(f"❌ Erreur {dimension.value}: {e}")
-                dimension_stats[dimension.value] = {"error": str(e)}
+            # 2. Transformer vers standard (CPU: hors de la boucle d'événements,
+            # pendant que les autres fetch se poursuivent)
+            standardized = await asyncio.to_thread(adapter.transform_to_standard, dimension, raw_data)
+            
+            logger.info(f"📥 {dimension.value}: {len(standardized)} enregistrements")
+            return raw_data, standardized
+        
+        outcomes = await asyncio.gather(
+            *(ingest_dimension(dimension) for dimension in supported),
+            return_exceptions=True
+        )
+        
+        standardized_lots: List[List[Dict[str, Any]]] = []
+        total_records = 0
+        dimension_stats: Dict[str, Dict[str, Any]] = {}
+        
+        for dimension, outcome in zip(supported, outcomes):
+            if isinstance(outcome, BaseException):
+                # Annulation, interruption...: propagées, pas comptées comme erreur de dimension
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                logger.error(f"❌ Erreur {dimension.value}: {outcome}")
+                dimension_stats[dimension.value] = {"error": str(outcome)}
+                continue
+            
+            raw_data, standardized = outcome
+            standardized_lots.append(standardized)
+            total_records += len(standardized)
+            dimension_stats[dimension.value] = {
+                "raw_count": len(raw_data),
+                "standardized_count": len(standardized)
+            }
         
-        # 3. Normaliser vers SafetyGraph
-        safetygraph_result = self.normalizer.normalize(all_standardized)
+        # 3. Normaliser vers SafetyGraph (lots enchaînés, sans liste fusionnée)
+        safetygraph_result = self.normalizer.normalize(chain.from_iterable(standardized_lots))
         
         # Résultat
         result = {
@@ -719,7 +1077,7 @@ class SGSSTIngestionManager:
             "duration_ms": int((datetime.now() - start_time).total_seconds() * 1000),
             "dimensions_processed": len(dimension_stats),
             "dimension_stats": dimension_stats,
-            "total_records": len(all_standardized),
+            "total_records": total_records,
             "safetygraph": safetygraph_result["summary"],
             "status": "success"
         }
@@ -728,16 +1086,30 @@ class SGSSTIngestionManager:
         
         return result
     
-    async def ingest_from_all(self, filters: Dict = None) -> Dict[str, Any]:
-        """Ingère depuis toutes les plateformes connectées"""
-        results = {}
-        for platform_name, adapter in self.adapters.items():
-            if adapter.connected:
-                try:
-                    result = await self.ingest_from_platform(platform_name, filters=filters)
-                    results[platform_name] = result
-                except Exception as e:
-                    results[platform_name] = {"error": str(e)}
+    def export_history(self) -> bytes:
+        """Sérialiser l'historique d'ingestion en JSON (orjson) pour la persistance"""
+        return orjson.dumps(self.ingestion_history, option=_ORJSON_OPTIONS)
+    
+    async def ingest_from_all(
+        self,
+        filters: Optional[Dict] = None,
+        dimensions: Optional[List[SSEDimension]] = None
+    ) -> Dict[str, Any]:
+        """Ingère depuis toutes les plateformes connectées (en parallèle)"""
+        # Plateformes sans aucune des dimensions demandées: écartées d'un seul &
+        requested_mask = _dimension_mask(dimensions) if dimensions else None
+        connected = [
+            name for name, adapter in self.adapters.items()
+            if adapter.connected and (requested_mask is None or adapter.dimension_mask & requested_mask)
+        ]
+        outcomes = await asyncio.gather(
+            *(self.ingest_from_platform(name, dimensions, filters) for name in connected),
+            return_exceptions=True
+        )
+        results = {
+            name: {"error": str(outcome)} if isinstance(outcome, Exception) else outcome
+            for name, outcome in zip(connected, outcomes)
+        }
         
         return {
             "platforms_processed": len(results),
@@ -756,6 +1128,8 @@ class ExampleSGSSTAdapter(GenericSGSSTAdapter):
     Utilisez ce template pour créer un adaptateur pour votre plateforme.
     """
     
+    __slots__ = ()  # attributs hérités uniquement
+    
     def __init__(self):
         super().__init__(
             platform_name="ExampleSGSST",
@@ -796,7 +1170,7 @@ class ExampleSGSSTAdapter(GenericSGSSTAdapter):
             return True
         return False
     
-    def fetch_data(self, dimension: SSEDimension, filters: Dict = None) -> List[Dict]:
+    async def fetch_data(self, dimension: SSEDimension, filters: Optional[Dict] = None) -> List[Dict]:
         """Récupère les données brutes"""
         # En production: appel API réel
         # Simulation de données
@@ -810,35 +1184,183 @@ class ExampleSGSSTAdapter(GenericSGSSTAdapter):
                 {"id": "INC-001", "occurrence_date": "2026-01-15", "site": "Zone A", "type": "near_miss"},
             ]
         return []
-    
-    def _map_field(self, standard_field: str, record: Dict) -> Any:
-        """Mappe les champs de la plateforme vers le standard"""
-        possible_fields = self._field_mappings.get(standard_field, [])
-        for field in possible_fields:
-            if field in record:
-                return record[field]
-        return None
 
 
 # =============================================================================
 # SECTION 8: DIGITAL TWIN BUILDER (INTÉGRATION)
 # =============================================================================
 
+# Styles visuels par dimension: objets uniques partagés par toutes les couches,
+# en lecture seule (ne pas muter le "style" d'une couche)
+_STYLE_BY_DIMENSION: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "risks_opportunities": MappingProxyType({"color": "#FF4444", "icon": "warning", "opacity": 0.8}),
+    "incidents_nonconformities": MappingProxyType({"color": "#FF8800", "icon": "alert", "opacity": 0.9}),
+    "compliance_requirements": MappingProxyType({"color": "#4444FF", "icon": "check", "opacity": 0.7}),
+    "audits_inspections": MappingProxyType({"color": "#00AA00", "icon": "clipboard", "opacity": 0.7}),
+    "emergency_crisis": MappingProxyType({"color": "#FF0000", "icon": "siren", "opacity": 1.0}),
+})
+_DEFAULT_STYLE: Mapping[str, Any] = MappingProxyType({"color": "#888888", "icon": "circle", "opacity": 0.5})
+
+
+def _coords_view(x: float, y: float, z: float) -> Mapping[str, float]:
+    """Vue dict (lecture seule) de coordonnées stockées en scalaires x/y/z"""
+    return MappingProxyType({"x": x, "y": y, "z": z})
+
+
+@dataclass(slots=True)
+class SpatialElement:
+    """
+    Élément spatial d'une couche: vue ligne (enregistrement compact) des
+    colonnes SoA, produite à la demande par DigitalTwinBuilder.iter_elements.
+    """
+    id: Any
+    type: str
+    dimension: str
+    # Vue en lecture seule des propriétés du nœud source (voir editable_properties)
+    properties: Mapping[str, Any]
+    x: float
+    y: float
+    z: float
+    visibility: bool = True
+    # Style partagé en lecture seule (même objet pour tous les éléments)
+    style: Mapping[str, Any] = field(default_factory=lambda: _DEFAULT_STYLE)
+    
+    @property
+    def xyz(self) -> Tuple[float, float, float]:
+        """Coordonnées (x, y, z)"""
+        return (self.x, self.y, self.z)
+    
+    @property
+    def coordinates(self) -> Mapping[str, float]:
+        """Coordonnées sous forme de mapping {x, y, z}, construit à la demande"""
+        return _coords_view(self.x, self.y, self.z)
+    
+    def editable_properties(self) -> Dict[str, Any]:
+        """
+        Propriétés modifiables de l'élément.
+        
+        La vue en lecture seule est remplacée par une copie à la première
+        demande (copie sur écriture): le graphe source n'est jamais modifié.
+        """
+        if isinstance(self.properties, MappingProxyType):
+            self.properties = dict(self.properties)
+        return cast(Dict[str, Any], self.properties)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme dict de l'élément, pour la sérialisation JSON"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "dimension": self.dimension,
+            "properties": dict(self.properties),
+            "coordinates": {"x": self.x, "y": self.y, "z": self.z},
+            "visibility": self.visibility,
+            "style": dict(self.style)
+        }
+
+
+# Label → catégorie spécifique, et priorité quand plusieurs labels s'appliquent
+# (un nœud Risk/Hazard reste un risque même s'il porte aussi Zone)
+_CATEGORY_BY_LABEL: Mapping[str, str] = MappingProxyType({
+    "Risk": "risks",
+    "Hazard": "risks",
+    "Zone": "zones",
+    "Equipment": "equipment",
+})
+_CATEGORY_PRIORITY: Mapping[str, int] = MappingProxyType({"risks": 0, "zones": 1, "equipment": 2})
+
+
+# Couches du twin: une par dimension SSE/HSE (ordre de l'enum), plus une couche
+# "_unknown" pour les nœuds sans dimension reconnue. Clés et codes fixés ici
+_UNKNOWN_LAYER = "_unknown"
+_LAYER_KEYS: Tuple[str, ...] = tuple(d.value for d in SSEDimension) + (_UNKNOWN_LAYER,)
+_LAYER_CODE: Mapping[str, int] = MappingProxyType({key: code for code, key in enumerate(_LAYER_KEYS)})
+
+
+# Coordonnées: (champ, champ de repli) par axe x/y/z
+_COORD_FIELDS: Tuple[Tuple[str, str], ...] = (("x", "longitude"), ("y", "latitude"), ("z", "elevation"))
+_COORD_KEYS = frozenset(key for pair in _COORD_FIELDS for key in pair)
+
+
+def _extract_coords_batch(props: List[Dict]) -> np.ndarray:
+    """
+    Extrait ou génère les coordonnées spatiales de tous les nœuds: tableau (N, 3).
+    
+    Les nœuds sans aucun champ de position (cas courant des données
+    normalisées) restent à l'origine; seuls les nœuds positionnés sont lus,
+    un np.fromiter par axe.
+    """
+    coords = np.zeros((len(props), 3), dtype=np.float64)
+    positioned = [i for i, p in enumerate(props) if not _COORD_KEYS.isdisjoint(p)]
+    if positioned:
+        located = [props[i] for i in positioned]
+        for axis, (key, fallback) in enumerate(_COORD_FIELDS):
+            coords[positioned, axis] = np.fromiter(
+                (p[key] if key in p else p.get(fallback, 0) for p in located),
+                dtype=np.float64, count=len(located)
+            )
+    return coords
+
+
+def _normalize_xyz(coords: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Nettoie les coordonnées (N, 3) et retourne la boîte englobante (min, max), None si vide"""
+    if not len(coords):
+        return None
+    coords[~np.isfinite(coords)] = 0.0
+    return coords.min(axis=0), coords.max(axis=0)
+
+
+@lru_cache(maxsize=256)
+def _category_of(labels: Tuple[str, ...]) -> Optional[str]:
+    """Catégorie d'un jeu de labels (None si aucune), une passe par jeu distinct"""
+    category = None
+    for label in labels:
+        candidate = _CATEGORY_BY_LABEL.get(label)
+        if candidate is not None and (
+            category is None or _CATEGORY_PRIORITY[candidate] < _CATEGORY_PRIORITY[category]
+        ):
+            category = candidate
+    return category
+
+
 class DigitalTwinBuilder:
     """
     Construit le Digital Twin 3D à partir des données SafetyGraph.
     Intègre les 15 dimensions SSE/HSE dans une représentation spatiale.
+    
+    Les couches sont stockées en colonnes (SoA): par dimension, des tableaux
+    parallèles id / type_code / coords (N, 3) / visibility / props, plus le
+    style commun de la couche. type_code indexe self.type_names.
+    
+    La construction se fait en deux temps: un balayage des nœuds (colonnes
+    du twin + lignes de chaque couche), puis la matérialisation des couches,
+    immédiate ou à la demande (materialize_layer).
     """
     
+    # Nombre de nœuds traités par tuile lors du balayage
+    TILE_SIZE = 4096
+    
     def __init__(self, twin_id: str = None):
         self.twin_id = twin_id or f"TWIN-{uuid.uuid4().hex[:8]}"
         self.version = 1
-        self.zones: List[Dict] = []
-        self.risks: List[Dict] = []
-        self.equipment: List[Dict] = []
-        self.layers: Dict[str, List[Dict]] = {}
-    
-    def build_from_safetygraph(self, safetygraph_data: Dict) -> Dict:
+        # Identifiants des éléments par catégorie
+        self.zones: np.ndarray = np.empty(0, dtype=object)
+        self.risks: np.ndarray = np.empty(0, dtype=object)
+        self.equipment: np.ndarray = np.empty(0, dtype=object)
+        # Couches matérialisées (toutes après un build complet, sinon à la demande)
+        self.layers: Dict[str, Dict[str, Any]] = {}
+        # Résultat du balayage: colonnes du twin et lignes de chaque couche
+        self._columns: Dict[str, np.ndarray] = {}
+        self._layer_rows: Dict[str, np.ndarray] = {}
+        # Nombre d'éléments du twin, tenu à jour par le balayage
+        self._total_elements = 0
+        # Vocabulaire des types d'éléments (premier label): les couches ne
+        # stockent que le code (index dans ce tuple)
+        self.type_names: Tuple[str, ...] = ()
+        # Boîte englobante du twin: (min xyz, max xyz), None tant qu'il est vide
+        self.bbox: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    
+    def build_from_safetygraph(self, safetygraph_data: Dict, lazy: bool = False) -> Dict:
         """
         Construit le Twin à partir des données SafetyGraph normalisées.
         
@@ -849,87 +1371,242 @@ class DigitalTwinBuilder:
         - Couche Équipements
         - Couche Zones
         - etc.
+        
+        Avec lazy=True, seules les métadonnées sont calculées: "layers" reste
+        vide et chaque couche est construite au premier materialize_layer().
         """
         nodes = safetygraph_data.get("nodes", [])
+        n = len(nodes)
         
-        # Organiser par dimension/label
-        for node in nodes:
-            dimension = node.get("properties", {}).get("dimension")
-            labels = node.get("labels", [])
-            
-            # Créer la couche si nécessaire
-            if dimension not in self.layers:
-                self.layers[dimension] = []
-            
-            # Ajouter à la couche appropriée
-            spatial_element = {
-                "id": node.get("id"),
-                "type": labels[0] if labels else "Unknown",
-                "dimension": dimension,
-                "properties": node.get("properties", {}),
-                "coordinates": self._extract_coordinates(node),
-                "visibility": True,
-                "style": self._get_style_for_dimension(dimension)
-            }
-            
-            self.layers[dimension].append(spatial_element)
-            
-            # Catégoriser spécifiquement
-            if "Risk" in labels or "Hazard" in labels:
-                self.risks.append(spatial_element)
-            elif "Zone" in labels:
-                self.zones.append(spatial_element)
-            elif "Equipment" in labels:
-                self.equipment.append(spatial_element)
+        # Colonnes de tous les nœuds, préallouées puis remplies par tuiles de
+        # TILE_SIZE nœuds: toutes les extractions d'une tuile s'enchaînent tant
+        # que ses dicts sont encore en cache, au lieu d'une passe complète par colonne
+        ids = np.empty(n, dtype=object)
+        # Types encodés par dictionnaire (code = ordre de première apparition)
+        type_code_of: Dict[str, int] = {}
+        type_codes = np.empty(n, dtype=np.uint16)
+        properties = np.empty(n, dtype=object)
+        coords = np.empty((n, 3), dtype=np.float64)
+        categories = np.empty(n, dtype=object)
+        # Découper par dimension (ordre de _LAYER_KEYS). Passe 1: code de
+        # couche de chaque nœud (table fixe, dimension inconnue → "_unknown");
+        # passe 2: une permutation stable range les nœuds par couche, chaque
+        # couche en est une tranche contiguë
+        layer_code = _LAYER_CODE.get
+        unknown_code = _LAYER_CODE[_UNKNOWN_LAYER]
+        codes = np.empty(n, dtype=np.intp)
+        for start in range(0, n, self.TILE_SIZE):
+            tile = nodes[start:start + self.TILE_SIZE]
+            stop = start + len(tile)
+            props = [node.get("properties", {}) for node in tile]
+            labels = [node.get("labels", []) for node in tile]
+            ids[start:stop] = [node.get("id") for node in tile]
+            type_codes[start:stop] = [
+                type_code_of.setdefault(l[0] if l else "Unknown", len(type_code_of)) for l in labels
+            ]
+            properties[start:stop] = props
+            coords[start:stop] = _extract_coords_batch(props)
+            # Les labels viennent du schéma de la dimension: quelques jeux distincts,
+            # chacun résolu une fois (cache) au lieu de scans "in labels" par nœud
+            categories[start:stop] = [_category_of(tuple(l)) for l in labels]
+            codes[start:stop] = [layer_code(p.get("dimension"), unknown_code) for p in props]
+        self.type_names = tuple(type_code_of)
+        self._finalize_spatial(coords)
+        
+        counts = np.bincount(codes, minlength=len(_LAYER_KEYS))
+        bounds = np.cumsum(counts).tolist()
+        order = np.argsort(codes, kind="stable")
+        self._columns = {"id": ids, "type_code": type_codes, "coords": coords, "props": properties}
+        self._total_elements = n
+        self._layer_rows = {}
+        self.layers = {}
+        start = 0
+        # Seules les couches non vides sont retenues
+        for dimension, count, end in zip(_LAYER_KEYS, counts.tolist(), bounds):
+            if count:
+                self._layer_rows[dimension] = order[start:end]
+            start = end
+        
+        # Catégoriser spécifiquement
+        self.risks = ids[categories == "risks"]
+        self.zones = ids[categories == "zones"]
+        self.equipment = ids[categories == "equipment"]
+        
+        if not lazy:
+            for dimension in self._layer_rows:
+                self.materialize_layer(dimension)
         
         return {
             "twin_id": self.twin_id,
             "version": self.version,
             "layers": self.layers,
-            "summary": {
-                "total_layers": len(self.layers),
-                "total_elements": sum(len(l) for l in self.layers.values()),
-                "risks_count": len(self.risks),
-                "zones_count": len(self.zones),
-                "equipment_count": len(self.equipment)
-            }
+            "layer_names": self.layer_names,
+            "summary": self.summary()
         }
     
-    def _extract_coordinates(self, node: Dict) -> Dict:
-        """Extrait ou génère les coordonnées spatiales"""
-        props = node.get("properties", {})
+    @property
+    def layer_names(self) -> List[str]:
+        """Dimensions présentes dans le twin (matérialisées ou non)"""
+        return list(self._layer_rows)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Statistiques du twin, disponibles sans matérialiser les couches"""
         return {
-            "x": props.get("x", props.get("longitude", 0)),
-            "y": props.get("y", props.get("latitude", 0)),
-            "z": props.get("z", props.get("elevation", 0))
+            "total_layers": len(self._layer_rows),
+            "total_elements": self._total_elements,
+            "risks_count": self.risks.size,
+            "zones_count": self.zones.size,
+            "equipment_count": self.equipment.size,
+            "bbox": None if self.bbox is None else {
+                "min": self.bbox[0].tolist(),
+                "max": self.bbox[1].tolist()
+            }
         }
     
-    def _get_style_for_dimension(self, dimension: str) -> Dict:
-        """Retourne le style visuel pour une dimension"""
-        styles = {
-            "risks_opportunities": {"color": "#FF4444", "icon": "warning", "opacity": 0.8},
-            "incidents_nonconformities": {"color": "#FF8800", "icon": "alert", "opacity": 0.9},
-            "compliance_requirements": {"color": "#4444FF", "icon": "check", "opacity": 0.7},
-            "audits_inspections": {"color": "#00AA00", "icon": "clipboard", "opacity": 0.7},
-            "emergency_crisis": {"color": "#FF0000", "icon": "siren", "opacity": 1.0},
+    def materialize_layer(self, dimension: str) -> Optional[Dict[str, Any]]:
+        """Construit (une fois) les colonnes d'une couche; None si la couche n'existe pas"""
+        layer = self.layers.get(dimension)
+        if layer is None:
+            rows = self._layer_rows.get(dimension)
+            if rows is None:
+                return None
+            layer = self.layers[dimension] = self._build_layer(dimension, rows)
+        return layer
+    
+    def _build_layer(self, dimension: str, rows: np.ndarray) -> Dict[str, Any]:
+        """Colonnes d'une couche, extraites des colonnes du twin"""
+        columns = self._columns
+        return {
+            "id": columns["id"][rows],
+            "type_code": columns["type_code"][rows],
+            "coords": columns["coords"][rows],
+            "visibility": np.ones(rows.size, dtype=bool),
+            "props": columns["props"][rows],
+            "style": self._get_style_for_dimension(dimension)
         }
-        return styles.get(dimension, {"color": "#888888", "icon": "circle", "opacity": 0.5})
+    
+    async def stream_twin(self) -> AsyncIterator[bytes]:
+        """
+        Sérialise le twin en NDJSON, une ligne à la fois: en-tête, une ligne
+        par couche, puis le résumé.
+        
+        Les couches non matérialisées sont construites pour la ligne puis
+        libérées (pas de mise en cache): le pic mémoire reste de l'ordre
+        d'une couche, pas du twin complet.
+        """
+        yield orjson.dumps({
+            "type": "header",
+            "twin_id": self.twin_id,
+            "version": self.version,
+            "layer_names": self.layer_names,
+            "type_names": self.type_names
+        }) + b"\n"
+        for dimension, rows in self._layer_rows.items():
+            layer = self.layers.get(dimension) or self._build_layer(dimension, rows)
+            # Colonnes numériques sérialisées directement (OPT_SERIALIZE_NUMPY),
+            # colonnes objet converties en listes
+            yield orjson.dumps({
+                "type": "layer",
+                "dimension": dimension,
+                "id": layer["id"].tolist(),
+                "type_code": layer["type_code"],
+                "coords": layer["coords"],
+                "visibility": layer["visibility"],
+                "props": layer["props"].tolist(),
+                "style": dict(layer["style"])
+            }, option=_ORJSON_OPTIONS) + b"\n"
+            # Laisser la main à la boucle d'événements entre deux couches
+            await asyncio.sleep(0)
+        yield orjson.dumps({"type": "summary", **self.summary()}) + b"\n"
+    
+    def iter_elements(self, dimension: str) -> Iterator[SpatialElement]:
+        """Éléments d'une couche, un SpatialElement par ligne (aucun si la couche n'existe pas)"""
+        layer = self.materialize_layer(dimension)
+        if layer is None:
+            return
+        type_names = self.type_names
+        style = layer["style"]
+        for element_id, type_code, (x, y, z), visible, props in zip(
+            layer["id"], layer["type_code"].tolist(), layer["coords"].tolist(),
+            layer["visibility"].tolist(), layer["props"]
+        ):
+            yield SpatialElement(
+                element_id, type_names[type_code], dimension, MappingProxyType(props),
+                x, y, z, visible, style
+            )
+    
+    def layer_types(self, dimension: str) -> np.ndarray:
+        """Types (chaînes) des éléments d'une couche, décodés depuis type_code (vide si la couche n'existe pas)"""
+        layer = self.materialize_layer(dimension)
+        if layer is None:
+            return np.empty(0, dtype=object)
+        return np.asarray(self.type_names, dtype=object)[layer["type_code"]]
+    
+    def _finalize_spatial(self, coords: np.ndarray) -> None:
+        """Valide les coordonnées (non finies → 0.0) et calcule la boîte englobante"""
+        self.bbox = _normalize_xyz(coords)
+    
+    def _get_style_for_dimension(self, dimension: str) -> Mapping[str, Any]:
+        """Retourne le style visuel (partagé, en lecture seule) pour une dimension"""
+        return _STYLE_BY_DIMENSION.get(dimension, _DEFAULT_STYLE)
 
 
 # =============================================================================
 # SECTION 9: API PUBLIQUE
 # =============================================================================
 
+# Liste des dimensions (données statiques): construite une fois à l'import
+_DIMENSIONS_LISTING: Tuple[Mapping[str, Any], ...] = tuple(
+    MappingProxyType({
+        "id": dim.value,
+        "name": dim.name.replace("_", " ").title(),
+        "iso_clause": DIMENSION_SCHEMAS[dim].iso_clause,
+        "cnesst_mapping": DIMENSION_SCHEMAS[dim].cnesst_mapping
+    })
+    for dim in SSEDimension
+)
+
+
+@lru_cache(maxsize=32)
+def _dimension_schema_view(dimension: str) -> Optional[Mapping[str, Any]]:
+    """Réponse figée (partagée entre appels) du schéma d'une dimension, None si inconnue"""
+    dim_enum = _VALUE_TO_DIM.get(dimension)
+    if dim_enum is None:
+        return None
+    schema = DIMENSION_SCHEMAS[dim_enum]
+    return MappingProxyType({
+        "dimension": dimension,
+        "required_fields": schema.required_fields,
+        "optional_fields": schema.optional_fields,
+        "relationships": schema.relationships,
+        "neo4j_labels": schema.neo4j_labels,
+        "cnesst_mapping": schema.cnesst_mapping,
+        "iso_clause": schema.iso_clause
+    })
+
+
+# Réponses JSON des schémas, sérialisées une fois à l'import (contenu statique)
+_SCHEMA_BYTES: Mapping[str, bytes] = MappingProxyType({
+    dim.value: orjson.dumps(dict(cast(Mapping[str, Any], _dimension_schema_view(dim.value))))
+    for dim in SSEDimension
+})
+
+
 class SafeTwinDigitalTwinHubAPI:
     """
     API publique du SafeTwin Digital Twin Hub.
     Point d'entrée unique pour toutes les opérations.
     """
     
+    # Twins gardés en mémoire (références fortes, les moins récents évincés)
+    MAX_TWINS = 128
+    
     def __init__(self):
         self.ingestion_manager = SGSSTIngestionManager()
         self.normalizer = SafetyGraphNormalizer()
-        self.twins: Dict[str, DigitalTwinBuilder] = {}
+        # Registre faible: un twin évincé reste accessible tant qu'il est référencé ailleurs
+        self.twins: WeakValueDictionary = WeakValueDictionary()
+        self._twin_cache: "OrderedDict[str, DigitalTwinBuilder]" = OrderedDict()
     
     # --- Gestion des adaptateurs ---
     
@@ -974,74 +1651,107 @@ class SafeTwinDigitalTwinHubAPI:
             dimensions: Liste des dimensions à ingérer
             filters: Filtres à appliquer
         """
-        dim_enums = [SSEDimension(d) for d in dimensions] if dimensions else None
+        dim_enums = None
+        if dimensions:
+            dim_enums = []
+            for value in dimensions:
+                dimension = _VALUE_TO_DIM.get(value)
+                if dimension is None:
+                    logger.warning(f"⚠️ Dimension inconnue ignorée: {value}")
+                    continue
+                dim_enums.append(dimension)
+            if not dim_enums:
+                raise ValueError(f"Aucune dimension connue parmi: {dimensions}")
         
         if platform_name:
             return await self.ingestion_manager.ingest_from_platform(
                 platform_name, dim_enums, filters
             )
         else:
-            return await self.ingestion_manager.ingest_from_all(filters)
+            return await self.ingestion_manager.ingest_from_all(filters, dim_enums)
     
     # --- Digital Twin ---
     
     def create_twin(self, safetygraph_data: Dict, twin_id: str = None) -> Dict:
-        """Crée un Digital Twin à partir des données SafetyGraph"""
+        """
+        Crée un Digital Twin à partir des données SafetyGraph.
+        Les couches sont matérialisées à la demande (get_twin_layer).
+        """
         builder = DigitalTwinBuilder(twin_id)
-        twin = builder.build_from_safetygraph(safetygraph_data)
-        self.twins[twin["twin_id"]] = builder
+        twin = builder.build_from_safetygraph(safetygraph_data, lazy=True)
+        self._store_twin(builder)
         return twin
     
-    def get_twin(self, twin_id: str) -> Optional[Dict]:
-        """Récupère un Digital Twin"""
+    def _store_twin(self, builder: DigitalTwinBuilder) -> None:
+        """Enregistre un twin (le plus récent) et évince les plus anciens au-delà de MAX_TWINS"""
+        self.twins[builder.twin_id] = builder
+        self._twin_cache[builder.twin_id] = builder
+        self._twin_cache.move_to_end(builder.twin_id)
+        while len(self._twin_cache) > self.MAX_TWINS:
+            self._twin_cache.popitem(last=False)
+    
+    def _lookup_twin(self, twin_id: str) -> Optional[DigitalTwinBuilder]:
         builder = self.twins.get(twin_id)
+        if builder is not None:
+            # Accès = récent: (re)placé en fin de LRU
+            self._store_twin(builder)
+        return builder
+    
+    def get_twin(self, twin_id: str) -> Optional[Dict]:
+        """Récupère un Digital Twin: résumé et noms de couches (sans les données)"""
+        builder = self._lookup_twin(twin_id)
         if builder:
             return {
                 "twin_id": builder.twin_id,
                 "version": builder.version,
-                "layers": builder.layers
+                "layer_names": builder.layer_names,
+                "summary": builder.summary()
             }
         return None
     
+    def get_twin_layer(self, twin_id: str, dimension: str) -> Optional[Dict[str, Any]]:
+        """Récupère une couche d'un Digital Twin (matérialisée au premier accès)"""
+        builder = self._lookup_twin(twin_id)
+        if builder is None:
+            return None
+        return builder.materialize_layer(dimension)
+    
+    def stream_twin(self, twin_id: str) -> Optional[AsyncIterator[bytes]]:
+        """
+        Flux NDJSON d'un Digital Twin (voir DigitalTwinBuilder.stream_twin),
+        à transmettre tel quel à une réponse HTTP en streaming.
+        """
+        builder = self._lookup_twin(twin_id)
+        if builder is None:
+            return None
+        return builder.stream_twin()
+    
     # --- Schémas et référentiels ---
     
-    def get_dimension_schema(self, dimension: str) -> Dict:
-        """Retourne le schéma d'une dimension SSE/HSE"""
-        dim_enum = SSEDimension(dimension)
-        schema = DIMENSION_SCHEMAS.get(dim_enum)
-        if schema:
-            return {
-                "dimension": dimension,
-                "required_fields": schema.required_fields,
-                "optional_fields": schema.optional_fields,
-                "relationships": schema.relationships,
-                "neo4j_labels": schema.neo4j_labels,
-                "cnesst_mapping": schema.cnesst_mapping,
-                "iso_clause": schema.iso_clause
-            }
+    def get_dimension_schema(self, dimension: str) -> Dict[str, Any]:
+        """Retourne le schéma d'une dimension SSE/HSE (copie en types JSON natifs de la vue en cache)"""
+        schema = _dimension_schema_view(dimension)
+        if schema is not None:
+            return {key: list(value) if isinstance(value, tuple) else value for key, value in schema.items()}
         return {"error": f"Dimension inconnue: {dimension}"}
     
-    def list_dimensions(self) -> List[Dict]:
-        """Liste toutes les dimensions SSE/HSE supportées"""
-        return [
-            {
-                "id": dim.value,
-                "name": dim.name.replace("_", " ").title(),
-                "iso_clause": DIMENSION_SCHEMAS[dim].iso_clause,
-                "cnesst_mapping": DIMENSION_SCHEMAS[dim].cnesst_mapping
-            }
-            for dim in SSEDimension
-        ]
+    def get_dimension_schema_bytes(self, dimension: str) -> bytes:
+        """Schéma d'une dimension déjà sérialisé en JSON (à renvoyer tel quel par la couche HTTP)"""
+        payload = _SCHEMA_BYTES.get(dimension)
+        if payload is not None:
+            return payload
+        return orjson.dumps({"error": f"Dimension inconnue: {dimension}"})
+    
+    def list_dimensions(self) -> List[Dict[str, Any]]:
+        """Liste toutes les dimensions SSE/HSE supportées (copie de la table statique)"""
+        return [dict(entry) for entry in _DIMENSIONS_LISTING]
 
 
 # =============================================================================
 # SECTION 10: EXEMPLE D'UTILISATION
 # =============================================================================
 
-async def main():
-    """Exemple d'utilisation du SafeTwin Digital Twin Hub"""
-    
-    print("""
+_BANNER = """
     ╔══════════════════════════════════════════════════════════════════════╗
     ║                                                                      ║
     ║   🏗️  SAFETWIN DIGITAL TWIN HUB                                      ║
@@ -1054,7 +1764,13 @@ async def main():
     ║   Conformité: CNESST/LSST | Vision Zero | ISO 45001                 ║
     ║                                                                      ║
     ╚══════════════════════════════════════════════════════════════════════╝
-    """)
+    """
+
+
+async def main():
+    """Exemple d'utilisation du SafeTwin Digital Twin Hub"""
+    
+    print(_BANNER)
     
     # 1. Initialiser l'API
     api = SafeTwinDigitalTwinHubAPI()
@@ -1093,5 +1809,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())